@@ -1,15 +1,48 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
+from typing import Optional
 
-from app.models.bench import BenchesResponse, BenchListItem, BenchDetail, Location
-from app.db.queries import get_benches_within_radius, get_bench_by_id, get_data_window
-from app.services.exposure import get_bench_sun_status_batch
+from app.models.bench import BenchesResponse, BenchDetail, BenchBatchRequest, Location
+from app.db.queries import get_bench_by_id, get_benches_by_ids, get_data_window
+from app.services.exposure import (
+    UNKNOWN_STATUS,
+    current_bucket,
+    get_bench_sun_status_batch,
+    get_benches_with_sun_status,
+)
+from app.services.weather import is_sunny as check_weather_sunny
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+BENCHES_CACHE_CONTROL = "max-age=60"
+
+
+def _benches_etag(
+    lat: float, lon: float, radius: float, limit: Optional[int], weather_sunny: bool
+) -> str:
+    """Weak ETag for a bench query within the current 10-minute status bucket and weather gate state"""
+    bucket = current_bucket()
+    query_hash = hash((round(lat, 5), round(lon, 5), radius, limit)) & 0xFFFFFFFFFFFFFFFF
+    return f'W/"{bucket}-{int(weather_sunny)}-{query_hash:x}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (a list or `*`) against `etag`"""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
 @router.get(
     "/benches",
     response_model=BenchesResponse,
@@ -17,51 +50,113 @@ router = APIRouter()
     response_description="Current status for benches plus data window metadata"
 )
 async def get_benches(
+    request: Request,
     lat: float = Query(..., description="Latitude", ge=-90, le=90),
     lon: float = Query(..., description="Longitude", ge=-180, le=180),
-    radius: float = Query(1000, description="Search radius in meters", gt=0, le=10000)
+    radius: float = Query(1000, description="Search radius in meters", gt=0, le=10000),
+    limit: Optional[int] = Query(None, description="Return only the N nearest benches", ge=1, le=1000)
 ):
     """
     Get benches within a radius and return their current sun/shade state.
     
+    - Benches are ordered nearest first; `limit` keeps only the N nearest.
     - Rounds `now` to the nearest 10-minute timestamp.
     - Includes `window_start`/`window_end` describing the precomputed data window.
+    - Sends an ETag per query, 10-minute bucket and weather gate state; a
+      matching `If-None-Match` gets `304 Not Modified` without touching the
+      database.
     """
-    logger.info(f"Fetching benches near ({lat}, {lon}) within {radius}m")
+    # The gate reading is cached in memory, so this is normally no I/O
+    etag = _benches_etag(lat, lon, radius, limit, await check_weather_sunny())
+    headers = {"ETag": etag, "Cache-Control": BENCHES_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    logger.info("Fetching benches near (%s, %s) within %sm", lat, lon, radius)
     
     try:
-        benches = await get_benches_within_radius(lat, lon, radius)
-        window_start, window_end = await get_data_window()
+        (benches, status_map), (window_start, window_end) = await asyncio.gather(
+            get_benches_with_sun_status(lat, lon, radius, limit),
+            get_data_window(),
+        )
         
-        if not benches:
-            return BenchesResponse(benches=[], window_start=window_start, window_end=window_end)
+        # Build the BenchesResponse shape as plain dicts: rows come straight
+        # from the database and statuses from the service, so there is
+        # nothing for Pydantic to validate, and orjson encodes the datetimes
+        result = []
+        for bench in benches:
+            status, sun_until, remaining_minutes = status_map.get(bench['id'], UNKNOWN_STATUS)
+            result.append({
+                "id": bench['id'],
+                "osm_id": bench['osm_id'],
+                "name": bench['name'],
+                "location": {"lat": bench['lat'], "lon": bench['lon']},
+                "elevation": bench['elevation'],
+                "distance": bench['distance'],
+                "current_status": status,
+                "sun_until": sun_until,
+                "remaining_minutes": remaining_minutes,
+                "status_note": None,
+            })
         
-        bench_ids = [b['id'] for b in benches]
-        status_map = await get_bench_sun_status_batch(bench_ids)
+        logger.info("Found %s benches", len(result))
+        response = {
+            "benches": result,
+            "window_start": window_start,
+            "window_end": window_end,
+        }
+        return ORJSONResponse(response, headers=headers)
+        
+    except Exception as e:
+        logger.error("Error fetching benches: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post(
+    "/benches/batch",
+    response_model=list[BenchDetail],
+    summary="Get details with current sun status for several benches",
+    response_description="Bench details in request order; unknown IDs are omitted"
+)
+async def get_benches_batch(request: BenchBatchRequest):
+    """
+    Get detailed information for up to 200 benches in one request.
+    
+    - Uses one bench query and one batched status lookup for all IDs.
+    """
+    logger.info("Fetching %s benches in batch", len(request.ids))
+    
+    try:
+        benches, status_map = await asyncio.gather(
+            get_benches_by_ids(request.ids),
+            get_bench_sun_status_batch(request.ids),
+        )
+        by_id = {bench['id']: bench for bench in benches}
         
         result = []
-        for bench in benches:
-            status, sun_until, remaining_minutes = status_map.get(bench['id'], ("unknown", None, None))
-            status_note = None
+        for bench_id in dict.fromkeys(request.ids):
+            bench = by_id.get(bench_id)
+            if bench is None:
+                continue
             
-            result.append(BenchListItem(
+            status, sun_until, remaining_minutes = status_map.get(bench_id, UNKNOWN_STATUS)
+            result.append(BenchDetail(
                 id=bench['id'],
-                osm_id=bench.get('osm_id'),
-                name=bench.get('name'),
+                osm_id=bench['osm_id'],
+                name=bench['name'],
                 location=Location(lat=bench['lat'], lon=bench['lon']),
-                elevation=bench.get('elevation'),
-                distance=bench['distance'],
+                elevation=bench['elevation'],
                 current_status=status,
                 sun_until=sun_until,
                 remaining_minutes=remaining_minutes,
-                status_note=status_note
+                status_note=None,
+                created_at=bench['created_at']
             ))
         
-        logger.info(f"Found {len(result)} benches")
-        return BenchesResponse(benches=result, window_start=window_start, window_end=window_end)
+        return result
         
     except Exception as e:
-        logger.error(f"Error fetching benches: {e}")
+        logger.error("Error fetching bench batch: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -78,33 +173,35 @@ async def get_bench(bench_id: int):
     - Rounds `now` to the nearest 10-minute timestamp.
     - Includes precomputed window metadata.
     """
-    logger.info(f"Fetching bench {bench_id}")
+    logger.info("Fetching bench %s", bench_id)
     
     try:
-        bench = await get_bench_by_id(bench_id)
+        bench, status_map = await asyncio.gather(
+            get_bench_by_id(bench_id),
+            get_bench_sun_status_batch([bench_id]),
+        )
         
         if not bench:
             raise HTTPException(status_code=404, detail="Bench not found")
         
-        status_map = await get_bench_sun_status_batch([bench_id])
-        status, sun_until, remaining_minutes = status_map.get(bench_id, ("unknown", None, None))
+        status, sun_until, remaining_minutes = status_map.get(bench_id, UNKNOWN_STATUS)
         status_note = None
         
         return BenchDetail(
             id=bench['id'],
-            osm_id=bench.get('osm_id'),
-            name=bench.get('name'),
+            osm_id=bench['osm_id'],
+            name=bench['name'],
             location=Location(lat=bench['lat'], lon=bench['lon']),
-            elevation=bench.get('elevation'),
+            elevation=bench['elevation'],
             current_status=status,
             sun_until=sun_until,
             remaining_minutes=remaining_minutes,
             status_note=status_note,
-            created_at=bench.get('created_at')
+            created_at=bench['created_at']
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching bench {bench_id}: {e}")
+        logger.error("Error fetching bench %s: %s", bench_id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
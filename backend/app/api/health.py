@@ -21,7 +21,7 @@ async def health_check():
     status = "healthy" if db_healthy else "unhealthy"
     db_status = "connected" if db_healthy else "disconnected"
     
-    logger.debug(f"Health check: {status}, Database: {db_status}")
+    logger.debug("Health check: %s, Database: %s", status, db_status)
     
     return {
         "status": status,
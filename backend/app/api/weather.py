@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import datetime
 import logging
+import time
 
 from app.models.weather import WeatherResponse
 from app.services.weather import get_current_weather
@@ -11,9 +12,9 @@ from app.services.weather_openmeteo import (
     get_next_sunny_time,
     get_weather_summary,
     update_weather_for_region,
-    run_weather_update_once,
 )
-from app.services.scheduler import scheduler
+from app.services.exposure import STATUS_BUCKET_SECONDS, bucket_start, current_bucket
+from app.services.scheduler import scheduler, trigger_weather_update_now
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,7 @@ async def get_weather(
     Returns:
         Current weather status with sunshine information
     """
-    logger.info(f"Weather request received (refresh={refresh})")
+    logger.info("Weather request received (refresh=%s)", refresh)
 
     try:
         status, cache_hit = await get_current_weather(force_refresh=refresh)
@@ -44,7 +45,7 @@ async def get_weather(
         return WeatherResponse(status=status, cache_hit=cache_hit)
 
     except Exception as e:
-        logger.error(f"Error fetching weather: {e}")
+        logger.error("Error fetching weather: %s", e)
         raise HTTPException(
             status_code=503,
             detail="Weather service temporarily unavailable. Please try again later.",
@@ -70,7 +71,7 @@ async def get_weather_forecast(
     Returns:
         Weather summary with cloud cover predictions
     """
-    logger.info(f"Forecast request: lat={lat}, lon={lon}, hours={hours}")
+    logger.info("Forecast request: lat=%s, lon=%s, hours=%s", lat, lon, hours)
 
     try:
         summary = await get_weather_summary(lat, lon)
@@ -80,7 +81,7 @@ async def get_weather_forecast(
             **summary
         }
     except Exception as e:
-        logger.error(f"Error fetching weather forecast: {e}")
+        logger.error("Error fetching weather forecast: %s", e)
         raise HTTPException(
             status_code=503,
             detail="Weather forecast service temporarily unavailable.",
@@ -101,12 +102,13 @@ async def check_forecast_sunny(
     Args:
         lat: Latitude of the location
         lon: Longitude of the location
-        at: Time to check (ISO format, default: now)
+        at: Time to check (ISO format, default: start of the current
+            10-minute bucket)
 
     Returns:
         Sunny status with cloud cover percentage
     """
-    check_time = at or datetime.now(timezone.utc)
+    check_time = at or bucket_start(current_bucket())
 
     try:
         cloud_cover_percent = await get_cloud_cover_at_time(lat, lon, check_time)
@@ -127,7 +129,7 @@ async def check_forecast_sunny(
             "status": "cloudy" if not is_sunny else "sunny"
         }
     except Exception as e:
-        logger.error(f"Error checking sunny status: {e}")
+        logger.error("Error checking sunny status: %s", e)
         raise HTTPException(
             status_code=503,
             detail="Weather service temporarily unavailable.",
@@ -153,7 +155,9 @@ async def get_next_sunny(
     Returns:
         Next sunny timestamp and time until then
     """
-    from_time = datetime.now(timezone.utc)
+    now_ts = time.time()
+    # The 10-minute bucket keys the lookup; the countdown uses the exact time
+    from_time = bucket_start(int(now_ts) // STATUS_BUCKET_SECONDS)
 
     try:
         next_sunny = await get_next_sunny_time(lat, lon, from_time, hours)
@@ -166,49 +170,58 @@ async def get_next_sunny(
                 "status": "no_sunny_period"
             }
 
-        time_diff = (next_sunny - from_time).total_seconds() / 60
+        minutes_until = max(0, int(next_sunny.timestamp() - now_ts) // 60)
 
         return {
             "from_time": from_time.isoformat(),
             "search_hours": hours,
             "next_sunny": next_sunny.isoformat() if hasattr(next_sunny, 'isoformat') else str(next_sunny),
-            "minutes_until": int(time_diff),
+            "minutes_until": minutes_until,
             "status": "found"
         }
     except Exception as e:
-        logger.error(f"Error finding next sunny: {e}")
+        logger.error("Error finding next sunny: %s", e)
         raise HTTPException(
             status_code=503,
             detail="Weather service temporarily unavailable.",
         )
 
 
-@router.post("/weather/update")
+@router.post("/weather/update", status_code=202)
 async def trigger_weather_update():
     """
     Manually trigger weather forecast update
 
-    This endpoint triggers an immediate update of all weather forecasts.
+    This endpoint schedules an immediate run of the weather update job and
+    returns without waiting for all regions to be fetched.
     Usually, updates happen automatically every 5 minutes.
 
     Returns:
-        Update status and number of forecasts updated
+        Update status and when the update job runs
     """
     logger.info("Manual weather update triggered via API")
 
     try:
-        await run_weather_update_once()
-        return {
-            "status": "success",
-            "message": "Weather update completed"
-        }
+        run_time = trigger_weather_update_now()
     except Exception as e:
-        logger.error(f"Error triggering weather update: {e}")
+        logger.error("Error triggering weather update: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to update weather forecasts.",
         )
 
+    if run_time is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Weather scheduler is not running.",
+        )
+
+    return {
+        "status": "accepted",
+        "message": "Weather update scheduled",
+        "run_at": run_time.isoformat()
+    }
+
 
 @router.get("/weather/scheduler/status")
 async def get_scheduler_status():
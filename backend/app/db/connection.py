@@ -9,6 +9,38 @@ logger = logging.getLogger(__name__)
 # Global connection pool
 _pool: Optional[asyncpg.Pool] = None
 
+# Hot queries prepared on every new pool connection
+_hot_queries: list[str] = []
+
+
+class PreparedConnection(asyncpg.Connection):
+    """Connection that keeps its prepared statements for its whole lifetime"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+
+
+def register_hot_query(query: str) -> str:
+    """Register a query to be prepared when pool connections are opened"""
+    _hot_queries.append(query)
+    return query
+
+
+async def get_prepared(conn, query: str) -> asyncpg.prepared_stmt.PreparedStatement:
+    """Get the prepared statement for a query on this connection"""
+    stmt = conn.prepared.get(query)
+    if stmt is None:
+        stmt = await conn.prepare(query)
+        conn.prepared[query] = stmt
+    return stmt
+
+
+async def _prepare_hot_queries(conn: PreparedConnection):
+    """Parse and plan hot queries once per connection instead of per request"""
+    for query in _hot_queries:
+        await get_prepared(conn, query)
+
 
 async def init_db():
     """Initialize database connection pool"""
@@ -16,13 +48,17 @@ async def init_db():
     try:
         _pool = await asyncpg.create_pool(
             settings.database_url,
-            min_size=2,
-            max_size=10,
-            command_timeout=60
+            min_size=min(settings.db_pool_min_size, settings.db_pool_max_size),
+            max_size=settings.db_pool_max_size,
+            max_inactive_connection_lifetime=settings.db_max_inactive_connection_lifetime,
+            command_timeout=settings.db_command_timeout,
+            statement_cache_size=settings.db_statement_cache_size,
+            connection_class=PreparedConnection,
+            init=_prepare_hot_queries,
         )
         logger.info("Database pool created successfully")
     except Exception as e:
-        logger.error(f"Failed to create database pool: {e}")
+        logger.error("Failed to create database pool: %s", e)
         raise
 
 
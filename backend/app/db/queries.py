@@ -1,50 +1,154 @@
+import asyncio
 import logging
-from typing import List, Optional
+import time
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from app.db.connection import get_pool
+from asyncpg import Record
+
+from app.config import settings
+from app.db.connection import get_pool, get_prepared, register_hot_query
 
 logger = logging.getLogger(__name__)
 
+HEALTH_CACHE_SECONDS = 1.0
+HEALTH_TIMEOUT_SECONDS = 0.5
+
+# (monotonic time of last check, result) so liveness probes don't hit the pool
+_health_cache: Tuple[float, bool] = (float("-inf"), False)
+
+DATA_WINDOW_CACHE_SECONDS = 60.0
+
+# The exposure matrix load reads the whole future exposure window
+EXPOSURE_LOAD_TIMEOUT_SECONDS = 60.0
+
+# (monotonic time of last query, (window_start, window_end)); the window only
+# moves when the precomputation runs
+_data_window_cache: Tuple[float, Tuple[Optional[datetime], Optional[datetime]]] = (
+    float("-inf"), (None, None)
+)
+# Query shared by concurrent cache misses, cleared once it finishes
+_data_window_inflight: Optional[asyncio.Task] = None
+
+# benches.geom is GEOGRAPHY, so the radius and distance are in meters and
+# ST_DWithin/<-> on it are served by the GIST index benches_geom_idx.
+# Keep the search point cast to geography too; comparing against a
+# geometry would force a per-row cast and skip the index. Ordering by <->
+# walks the index nearest-first, so a LIMIT stops the scan early
+# (a NULL limit means no limit).
+BENCHES_WITH_STATUS_QUERY = register_hot_query("""
+    SELECT 
+        b.id,
+        b.osm_id,
+        b.name,
+        b.lat,
+        b.lon,
+        b.elevation,
+        ST_Distance(b.geom, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography) as distance,
+        e.exposed
+    FROM benches b
+    LEFT JOIN exposure e ON e.bench_id = b.id
+        AND e.ts_id = (SELECT id FROM timestamps WHERE ts = $4::timestamptz)
+    WHERE ST_DWithin(b.geom, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography, $3)
+    ORDER BY b.geom <-> ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography
+    LIMIT $5::int;
+""")
+
+BENCH_BY_ID_QUERY = register_hot_query("""
+    SELECT 
+        id,
+        osm_id,
+        name,
+        lat,
+        lon,
+        elevation,
+        created_at
+    FROM benches
+    WHERE id = $1;
+""")
+
+# Exposure is read the same way as in BENCHES_WITH_STATUS_QUERY: resolve
+# the timestamp id once, then one probe per bench on the covering
+# (bench_id, ts_id) INCLUDE (exposed) index.
+BENCH_STATUS_QUERY = register_hot_query("""
+    SELECT
+        b.lat,
+        b.lon,
+        e.exposed
+    FROM benches b
+    LEFT JOIN exposure e ON e.bench_id = b.id
+        AND e.ts_id = (SELECT id FROM timestamps WHERE ts = $2::timestamptz)
+    WHERE b.id = $1;
+""")
+
+BENCH_STATUS_BATCH_QUERY = register_hot_query("""
+    WITH now_ts AS (
+        SELECT id FROM timestamps WHERE ts = $2::timestamptz
+    ),
+    ids AS (
+        SELECT bench_id, ord FROM unnest($1::int[]) WITH ORDINALITY AS t(bench_id, ord)
+    )
+    SELECT
+        b.id as bench_id,
+        b.lat,
+        b.lon,
+        e.exposed
+    FROM ids i
+    JOIN benches b ON b.id = i.bench_id
+    LEFT JOIN exposure e ON e.bench_id = i.bench_id
+        AND e.ts_id = (SELECT id FROM now_ts)
+    ORDER BY i.ord;
+""")
+
+BENCHES_BY_IDS_QUERY = register_hot_query("""
+    SELECT 
+        id,
+        osm_id,
+        name,
+        lat,
+        lon,
+        elevation,
+        created_at
+    FROM benches
+    WHERE id = ANY($1::int[]);
+""")
 
-async def get_benches_within_radius(lat: float, lon: float, radius: float) -> List[dict]:
+
+async def get_benches_with_status(
+    lat: float,
+    lon: float,
+    radius: float,
+    current_time: datetime,
+    limit: Optional[int] = None,
+) -> List[Record]:
     """
-    Get benches within radius of a location
+    Get benches within radius of a location together with their clear-sky
+    exposure at the given time, in a single query.
     
     Args:
         lat: Latitude
         lon: Longitude
         radius: Search radius in meters
+        current_time: Current timestamp (rounded to 10-min interval)
+        limit: Maximum number of nearest benches to return (None for all)
         
     Returns:
-        List of bench dictionaries with distance
+        List of records (id, osm_id, name, lat, lon, elevation, distance,
+        exposed), nearest first; exposed is None if there is no data.
+        Records are returned as-is to avoid building a dict per row.
     """
     pool = await get_pool()
     
-    query = """
-        SELECT 
-            b.id,
-            b.osm_id,
-            b.name,
-            ST_Y(b.geom::geometry) as lat,
-            ST_X(b.geom::geometry) as lon,
-            b.elevation,
-            ST_Distance(b.geom, ST_SetSRID(ST_MakePoint($2, $1), 4326)) as distance
-        FROM benches b
-        WHERE ST_DWithin(b.geom, ST_SetSRID(ST_MakePoint($2, $1), 4326), $3)
-        ORDER BY distance;
-    """
-    
     try:
         async with pool.acquire() as conn:
-            rows = await conn.fetch(query, lat, lon, radius)
-            return [dict(row) for row in rows]
+            stmt = await get_prepared(conn, BENCHES_WITH_STATUS_QUERY)
+            return await stmt.fetch(lat, lon, radius, current_time, limit, timeout=settings.db_request_timeout)
     except Exception as e:
-        logger.error(f"Error querying benches: {e}")
+        logger.error("Error querying benches: %s", e)
         raise
 
 
-async def get_bench_by_id(bench_id: int) -> Optional[dict]:
+async def get_bench_by_id(bench_id: int) -> Optional[Record]:
     """
     Get bench by ID
     
@@ -52,120 +156,151 @@ async def get_bench_by_id(bench_id: int) -> Optional[dict]:
         bench_id: Bench ID
         
     Returns:
-        Bench dictionary or None if not found
+        Bench record or None if not found
     """
     pool = await get_pool()
     
-    query = """
-        SELECT 
-            id,
-            osm_id,
-            name,
-            ST_Y(geom::geometry) as lat,
-            ST_X(geom::geometry) as lon,
-            elevation,
-            created_at
-        FROM benches
-        WHERE id = $1;
-    """
-    
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query, bench_id)
-            return dict(row) if row else None
+            stmt = await get_prepared(conn, BENCH_BY_ID_QUERY)
+            return await stmt.fetchrow(bench_id, timeout=settings.db_request_timeout)
     except Exception as e:
-        logger.error(f"Error querying bench {bench_id}: {e}")
+        logger.error("Error querying bench %s: %s", bench_id, e)
         raise
 
 
-async def get_current_exposure(bench_id: int, current_time: datetime) -> Optional[bool]:
+async def get_benches_by_ids(bench_ids: list[int]) -> List[Record]:
     """
-    Get current sun exposure status for a bench
+    Get several benches by ID in a single query
     
     Args:
-        bench_id: Bench ID
-        current_time: Current timestamp (rounded to 10-min interval)
+        bench_ids: Bench IDs
         
     Returns:
-        True if exposed to sun, False if shaded, None if no data
+        List of bench records (unknown IDs are omitted)
     """
-    pool = await get_pool()
+    if not bench_ids:
+        return []
     
-    query = """
-        SELECT e.exposed
-        FROM exposure e
-        JOIN timestamps t ON t.id = e.ts_id
-        WHERE e.bench_id = $1
-        AND t.ts = $2::timestamptz
-        LIMIT 1;
-    """
+    pool = await get_pool()
     
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query, bench_id, current_time)
-            return row['exposed'] if row else None
+            stmt = await get_prepared(conn, BENCHES_BY_IDS_QUERY)
+            return await stmt.fetch(bench_ids, timeout=settings.db_request_timeout)
     except Exception as e:
-        logger.error(f"Error querying exposure for bench {bench_id}: {e}")
+        logger.error("Error querying benches %s: %s", bench_ids, e)
         raise
 
 
-async def get_next_sun_change(bench_id: int, current_time: datetime, current_status: bool) -> Optional[datetime]:
+async def get_bench_status_single(bench_id: int, current_time: datetime) -> Optional[Record]:
     """
-    Get next time when sun status changes
+    Get a bench's coordinates and current exposure in one query
     
     Args:
         bench_id: Bench ID
-        current_time: Current timestamp
-        current_status: Current exposure status (True=sunny, False=shady)
+        current_time: Current timestamp (rounded to 10-min interval)
         
     Returns:
-        Timestamp of next change, or None if no change found
+        Record with lat, lon and exposed (None if no data), or None if the
+        bench does not exist
     """
     pool = await get_pool()
     
-    # If currently sunny, find next shady time
-    # If currently shady, find next sunny time
-    target_status = not current_status
-    
-    query = """
-        SELECT t.ts::timestamptz
-        FROM exposure e
-        JOIN timestamps t ON t.id = e.ts_id
-        WHERE e.bench_id = $1
-        AND t.ts > $2::timestamptz
-        AND e.exposed = $3
-        ORDER BY t.ts
-        LIMIT 1;
-    """
-    
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query, bench_id, current_time, target_status)
-            return row['ts'] if row else None
+            stmt = await get_prepared(conn, BENCH_STATUS_QUERY)
+            return await stmt.fetchrow(bench_id, current_time, timeout=settings.db_request_timeout)
     except Exception as e:
-        logger.error(f"Error querying next sun change for bench {bench_id}: {e}")
+        logger.error("Error querying status for bench %s: %s", bench_id, e)
         raise
 
 
+async def _refresh_data_window() -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Query the data window and store it in the cache"""
+    global _data_window_cache
+
+    pool = await get_pool()
+    query = """
+        SELECT MIN(ts) AS start_ts, MAX(ts) AS end_ts FROM timestamps;
+    """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query)
+    window = (row['start_ts'], row['end_ts']) if row else (None, None)
+
+    _data_window_cache = (time.monotonic(), window)
+    return window
+
+
+def _clear_data_window_inflight(task: asyncio.Task) -> None:
+    """Forget a finished query so the next miss starts a new one"""
+    global _data_window_inflight
+
+    if _data_window_inflight is task:
+        _data_window_inflight = None
+    if not task.cancelled():
+        # Mark the exception as retrieved even if every waiter went away
+        task.exception()
+
+
 async def get_data_window() -> tuple[Optional[datetime], Optional[datetime]]:
     """
     Get min and max timestamps available in precomputed data.
+    Cached in-process for DATA_WINDOW_CACHE_SECONDS; concurrent misses
+    share one query.
 
     Returns:
         Tuple of (window_start, window_end) or (None, None) if no timestamps.
     """
+    global _data_window_inflight
+
+    cached_at, window = _data_window_cache
+    if time.monotonic() - cached_at < DATA_WINDOW_CACHE_SECONDS:
+        return window
+
+    if _data_window_inflight is None:
+        _data_window_inflight = asyncio.create_task(_refresh_data_window())
+        _data_window_inflight.add_done_callback(_clear_data_window_inflight)
+
+    try:
+        return await asyncio.shield(_data_window_inflight)
+    except Exception as e:
+        logger.error("Error querying data window: %s", e)
+        raise
+
+
+async def get_exposure_since(start_time: datetime) -> list:
+    """
+    Get all precomputed exposure from a point in time onwards, aggregated
+    per bench so the result is one record per bench rather than per cell.
+    Used to load the in-memory exposure matrix.
+    
+    Args:
+        start_time: Earliest timestamp to include
+        
+    Returns:
+        List of records with bench_id and time-ordered epochs (seconds)
+        and exposed arrays
+    """
     pool = await get_pool()
+    
     query = """
-        SELECT MIN(ts) AS start_ts, MAX(ts) AS end_ts FROM timestamps;
+        SELECT
+            e.bench_id,
+            array_agg(extract(epoch FROM t.ts)::bigint ORDER BY t.ts) AS epochs,
+            array_agg(e.exposed ORDER BY t.ts) AS exposed
+        FROM exposure e
+        JOIN timestamps t ON t.id = e.ts_id
+        WHERE t.ts >= $1::timestamptz
+        GROUP BY e.bench_id
+        ORDER BY e.bench_id;
     """
+    
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query)
-            if row:
-                return row['start_ts'], row['end_ts']
-            return None, None
+            return await conn.fetch(query, start_time, timeout=EXPOSURE_LOAD_TIMEOUT_SECONDS)
     except Exception as e:
-        logger.error(f"Error querying data window: {e}")
+        logger.error("Error loading exposure matrix: %s", e)
         raise
 
 
@@ -173,65 +308,63 @@ async def check_database_health() -> bool:
     """
     Check if database connection is healthy
     
+    The result is reused for HEALTH_CACHE_SECONDS, and a check that cannot
+    get a connection and answer within HEALTH_TIMEOUT_SECONDS counts as
+    unhealthy.
+    
     Returns:
         True if database is accessible, False otherwise
     """
+    global _health_cache
+    
+    checked_at, healthy = _health_cache
+    now = time.monotonic()
+    if now - checked_at < HEALTH_CACHE_SECONDS:
+        return healthy
+    
     try:
         pool = await get_pool()
-        async with pool.acquire() as conn:
-            result = await conn.fetchval("SELECT 1")
-            return result == 1
+        result = await asyncio.wait_for(pool.fetchval("SELECT 1"), HEALTH_TIMEOUT_SECONDS)
+        healthy = result == 1
     except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        return False
+        logger.error("Database health check failed: %s", e)
+        healthy = False
+    
+    _health_cache = (now, healthy)
+    return healthy
 
 
 async def get_bench_status_batch(
     bench_ids: list[int], current_time: datetime
-) -> list[dict]:
+) -> List[Record]:
     """
-    Get current exposure and next change for multiple benches in a single query.
+    Get current exposure for multiple benches in a single query.
     Reduces N+1 query pattern from ~40 queries to 1 for 20 benches.
+    Also returns bench coordinates so callers don't need a per-bench lookup.
+    
+    Rows are fetched in one go rather than through a server-side cursor:
+    callers pass at most 200 IDs (BenchBatchRequest) or a single ID, so the
+    result is small and a cursor would only add round trips and hold the
+    connection in a transaction while statuses are resolved.
     
     Args:
         bench_ids: List of bench IDs
         current_time: Current timestamp (rounded to 10-min interval)
         
     Returns:
-        List of dicts with bench_id, exposed, and next_change_ts
+        List of records with bench_id, lat, lon and exposed
     """
     if not bench_ids:
         return []
     
     pool = await get_pool()
     
-    query = """
-        SELECT
-            b.id as bench_id,
-            e.exposed,
-            next_sun.ts as next_change_ts
-        FROM unnest($1::int[]) WITH ORDINALITY AS t(bench_id, ord)
-        JOIN benches b ON b.id = t.bench_id
-        LEFT JOIN exposure e ON e.bench_id = b.id
-            AND e.ts_id = (SELECT id FROM timestamps WHERE ts = $2::timestamptz)
-        LEFT JOIN LATERAL (
-            SELECT t.ts FROM exposure e2
-            JOIN timestamps t ON t.id = e2.ts_id
-            WHERE e2.bench_id = b.id
-              AND t.ts > $2::timestamptz
-              AND e2.exposed != COALESCE(e.exposed, FALSE)
-            ORDER BY t.ts
-            LIMIT 1
-        ) next_sun ON true
-        ORDER BY t.ord;
-    """
-    
     try:
         async with pool.acquire() as conn:
-            rows = await conn.fetch(query, bench_ids, current_time)
-            return [dict(row) for row in rows]
+            stmt = await get_prepared(conn, BENCH_STATUS_BATCH_QUERY)
+            return await stmt.fetch(bench_ids, current_time, timeout=settings.db_request_timeout)
     except Exception as e:
-        logger.error(f"Error batch querying bench status: {e}")
+        logger.error("Error batch querying bench status: %s", e)
         raise
 
 
@@ -247,7 +380,7 @@ async def get_weather_adjusted_exposure(bench_id: int, target_time: datetime) ->
             row = await conn.fetchrow(query, bench_id, target_time)
             return row['is_sunny'] if row else None
     except Exception as e:
-        logger.error(f"Error querying weather-adjusted exposure for bench {bench_id}: {e}")
+        logger.error("Error querying weather-adjusted exposure for bench %s: %s", bench_id, e)
         raise
 
 
@@ -267,5 +400,5 @@ async def get_next_sunny_with_weather(
             row = await conn.fetchrow(query, bench_id, from_time, max_hours)
             return row['next_sunny'] if row else None
     except Exception as e:
-        logger.error(f"Error querying next sunny with weather for bench {bench_id}: {e}")
+        logger.error("Error querying next sunny with weather for bench %s: %s", bench_id, e)
         raise
@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 
 from app.config import settings
 from app.api import health, benches, weather
 from app.db.connection import init_db, close_db
-from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.http import close_http_session
+from app.services.scheduler import start_scheduler, stop_scheduler, warm_weather_caches
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -13,38 +16,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting Sonnenbankerl API")
+    logger.info("Environment: %s", settings.environment)
+    await init_db()
+    logger.info("Database connection initialized")
+    start_scheduler()
+    logger.info("Weather scheduler started")
+    try:
+        # Best effort: the scheduled update fills the caches if this fails
+        try:
+            await warm_weather_caches()
+        except Exception as e:
+            logger.warning("Could not warm weather caches: %s", e)
+        yield
+    finally:
+        logger.info("Shutting down Sonnenbankerl API")
+        # Stop scheduled jobs before the pool they use is closed
+        stop_scheduler()
+        await close_db()
+        logger.info("Database connection closed")
+        await close_http_session()
+
 app = FastAPI(
     title="Sonnenbankerl API",
     description="API for finding sunny benches in Graz",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins.split(",") if settings.allowed_origins != "*" else ["*"],
+    allow_origins=settings.allowed_origins_list,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup():
-    logger.info("Starting Sonnenbankerl API")
-    logger.info(f"Environment: {settings.environment}")
-    await init_db()
-    logger.info("Database connection initialized")
-    start_scheduler()
-    logger.info("Weather scheduler started")
-
-@app.on_event("shutdown")
-async def shutdown():
-    logger.info("Shutting down Sonnenbankerl API")
-    stop_scheduler()
-    await close_db()
-    logger.info("Database connection closed")
-
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(benches.router, prefix="/api", tags=["benches"])
 app.include_router(weather.router, prefix="/api", tags=["weather"])
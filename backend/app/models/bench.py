@@ -41,3 +41,8 @@ class BenchesResponse(BaseModel):
     benches: list[BenchListItem]
     window_start: Optional[datetime] = Field(None, description="Start of available precomputed window")
     window_end: Optional[datetime] = Field(None, description="End of available precomputed window")
+
+
+class BenchBatchRequest(BaseModel):
+    """Request body for fetching several benches at once"""
+    ids: list[int] = Field(..., min_length=1, max_length=200, description="Bench IDs (max 200)")
@@ -1,17 +1,26 @@
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
+import asyncio
 import logging
+import math
+import time
+
+import numpy as np
 
 from app.db.queries import (
-    get_current_exposure,
-    get_next_sun_change,
     get_bench_status_batch,
-    get_bench_by_id,
+    get_bench_status_single,
+    get_benches_with_status,
 )
+from app.services.exposure_matrix import UNKNOWN, get_exposure_matrix
 from app.services.weather import is_sunny as check_weather_sunny
 from app.services.weather_openmeteo import (
     is_sunny_at_time,
     get_next_sunny_time,
+    get_region_id,
+    get_sunny_hours_between,
+    load_weather_window,
     update_weather_for_region,
 )
 
@@ -19,17 +28,174 @@ logger = logging.getLogger(__name__)
 
 CLOUD_COVER_THRESHOLD = 20
 
+STATUS_BUCKET_SECONDS = 600
+
+# Bound on per-minute status results kept for repeated requests
+STATUS_RESULT_MAX_ENTRIES = 5000
+
+# How far ahead the weather-adjusted next change is searched
+WEATHER_SEARCH_HOURS = 48
+
+# Status of every bench while the current-weather gate reports no sun
+WEATHER_GATED_STATUS: Tuple[str, Optional[datetime], Optional[int]] = ("shady", None, None)
+UNKNOWN_STATUS: Tuple[str, Optional[datetime], Optional[int]] = ("unknown", None, None)
+
+# Resolved (status, sun_until) per bench for the current 10-minute bucket
+_status_cache: dict[int, Tuple[str, Optional[datetime]]] = {}
+_status_cache_bucket: Optional[int] = None
+
+# Resolved (status, sun_until) per set of bench ids for the current minute,
+# so identical requests within a minute skip the work; only sets where every
+# bench resolved are stored, and countdowns are attached on each hit
+_status_results: dict[frozenset, dict[int, Tuple[str, Optional[datetime]]]] = {}
+_status_results_minute: Optional[int] = None
+
+
+def current_bucket() -> int:
+    """Index of the current 10-minute bucket since the epoch"""
+    return int(time.time()) // STATUS_BUCKET_SECONDS
+
+
+@lru_cache(maxsize=4)
+def bucket_start(bucket: int) -> datetime:
+    """Start of a 10-minute bucket as a UTC datetime, built once per bucket"""
+    return datetime.fromtimestamp(bucket * STATUS_BUCKET_SECONDS, timezone.utc)
+
+
+@lru_cache(maxsize=4)
+def minute_start(minute: int) -> datetime:
+    """Start of a minute since the epoch as a UTC datetime, built once per minute"""
+    return datetime.fromtimestamp(minute * 60, timezone.utc)
+
+
+@lru_cache(maxsize=4)
+def hour_start(hour: int) -> datetime:
+    """Start of an hour since the epoch as a UTC datetime, built once per hour"""
+    return datetime.fromtimestamp(hour * 3600, timezone.utc)
+
 
 def round_to_10min(dt: datetime) -> datetime:
-    """Round datetime to nearest 10-minute interval"""
-    return dt.replace(second=0, microsecond=0, minute=(dt.minute // 10) * 10)
+    """Round datetime down to its 10-minute interval (UTC)"""
+    return bucket_start(int(dt.timestamp()) // STATUS_BUCKET_SECONDS)
 
 
 def round_to_hour(dt: datetime) -> datetime:
-    """Round datetime to nearest hour (30-minute threshold)"""
-    if dt.minute >= 30:
-        dt = dt + timedelta(hours=1)
-    return dt.replace(minute=0, second=0, microsecond=0)
+    """Round datetime to nearest hour (30-minute threshold, UTC)"""
+    return hour_start((int(dt.timestamp()) + 1800) // 3600)
+
+
+def _cached_statuses(now: datetime) -> dict[int, Tuple[str, Optional[datetime]]]:
+    """Return the status cache for the 10-minute bucket containing `now`"""
+    global _status_cache, _status_cache_bucket
+
+    bucket = int(now.timestamp()) // STATUS_BUCKET_SECONDS
+    if bucket != _status_cache_bucket:
+        _status_cache = {}
+        _status_cache_bucket = bucket
+    return _status_cache
+
+
+def _cached_results(now: datetime) -> dict[frozenset, dict[int, Tuple[str, Optional[datetime]]]]:
+    """Return the status result cache for the minute containing `now`"""
+    global _status_results, _status_results_minute
+
+    minute = int(now.timestamp()) // 60
+    if minute != _status_results_minute or len(_status_results) >= STATUS_RESULT_MAX_ENTRIES:
+        _status_results = {}
+        _status_results_minute = minute
+    return _status_results
+
+
+def _discard(task: Optional[asyncio.Task]) -> None:
+    """Cancel a task whose result is no longer needed, without leaking its error"""
+    if task is None:
+        return
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+def _with_remaining_minutes(
+    status: str, sun_until: Optional[datetime], now_ts: float
+) -> Tuple[str, Optional[datetime], Optional[int]]:
+    """Attach whole minutes until the next change from epoch `now_ts`, clamped at zero"""
+    if sun_until is None:
+        return status, None, None
+    return status, sun_until, max(0, int(sun_until.timestamp() - now_ts) // 60)
+
+
+async def _resolve_sun_status(
+    bench_id: int,
+    lat: float,
+    lon: float,
+    clear_sky_exposed: Optional[bool],
+    rounded_time: datetime,
+    sunny_hours: Optional[dict[int, bool]] = None,
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Combine clear-sky exposure with the weather forecast for one bench.
+
+    Args:
+        sunny_hours: Prefetched forecast for the bench's region (see
+            get_next_sun_change_with_weather); looked up per hour if None
+
+    Returns:
+        Tuple of (status, sun_until)
+    """
+    if clear_sky_exposed is None:
+        return "unknown", None
+
+    if sunny_hours is None:
+        is_weather_sunny = await is_sunny_at_time(lat, lon, rounded_time)
+    else:
+        current_hour = rounded_time.replace(minute=0, second=0, microsecond=0)
+        is_weather_sunny = sunny_hours.get(int(current_hour.timestamp()))
+
+    is_effectively_sunny = (
+        is_weather_sunny is True and clear_sky_exposed
+    )
+    effective_status = "sunny" if is_effectively_sunny else "shady"
+
+    next_change = await get_next_sun_change_with_weather(
+        bench_id, lat, lon, rounded_time, is_effectively_sunny, sunny_hours=sunny_hours
+    )
+
+    if next_change and next_change.tzinfo is None:
+        next_change = next_change.replace(tzinfo=timezone.utc)
+
+    return effective_status, next_change
+
+
+async def _resolve_sun_statuses(
+    rows: list[Tuple[int, float, float, Optional[bool]]],
+    rounded_time: datetime,
+    cache: dict[int, Tuple[str, Optional[datetime]]],
+) -> None:
+    """
+    Resolve (bench_id, lat, lon, clear_sky_exposed) rows into `cache`.
+
+    The forecast for every region in the batch is loaded once up front, so
+    each bench is resolved from memory (forecast and exposure matrix) and a
+    plain loop is enough. A bench whose lookup fails is logged and left out
+    of the cache.
+    """
+    if not rows:
+        return
+
+    regions = {get_region_id(lat, lon): (lat, lon) for _, lat, lon, _ in rows}
+    weather = await load_weather_window(
+        regions,
+        rounded_time.replace(minute=0, second=0, microsecond=0),
+        datetime.now(timezone.utc) + timedelta(hours=WEATHER_SEARCH_HOURS + 1),
+    )
+
+    for bench_id, lat, lon, exposed in rows:
+        try:
+            cache[bench_id] = await _resolve_sun_status(
+                bench_id, lat, lon, exposed, rounded_time,
+                weather[get_region_id(lat, lon)],
+            )
+        except Exception as e:
+            logger.error("Error getting sun status for bench %s: %s", bench_id, e)
 
 
 async def get_bench_sun_status_batch(
@@ -39,6 +205,9 @@ async def get_bench_sun_status_batch(
     """
     Get current sun status for multiple benches in a single query.
     More efficient than calling get_bench_sun_status() for each bench.
+    Resolved statuses are cached per minute, so repeated requests for the
+    same benches within a minute skip the work; remaining minutes are
+    still measured from the time of each request.
 
     Args:
         bench_ids: List of bench IDs
@@ -47,60 +216,142 @@ async def get_bench_sun_status_batch(
     Returns:
         Dict mapping bench_id to tuple of (status, sun_until, remaining_minutes)
     """
-    now = datetime.now(timezone.utc)
+    now_ts = time.time()
+    # The floored minute keys the caches; countdowns use the exact time
+    now = minute_start(int(now_ts) // 60)
     rounded_time = round_to_hour(now)
-    result = {}
+    result = dict.fromkeys(bench_ids, UNKNOWN_STATUS)
+    fetch = None
+
+    if not skip_weather_check:
+        results = _cached_results(now)
+        key = frozenset(bench_ids)
+        if key in results:
+            return {
+                bench_id: _with_remaining_minutes(*cached, now_ts)
+                for bench_id, cached in results[key].items()
+            }
+        cache = _cached_statuses(now)
 
     try:
-        batch_results = await get_bench_status_batch(bench_ids, rounded_time)
-
-        for row in batch_results:
-            bench_id = row['bench_id']
-            clear_sky_exposed = row['exposed']
+        if skip_weather_check:
+            # Clear-sky status straight from the exposure matrix
+            matrix = await get_exposure_matrix()
+            for bench_id, (exposed, next_change) in matrix.status(
+                bench_ids, round_to_10min(now)
+            ).items():
+                if exposed is not None:
+                    status = "sunny" if exposed else "shady"
+                    result[bench_id] = _with_remaining_minutes(status, next_change, now_ts)
+            return result
+
+        missing = [bench_id for bench_id in bench_ids if bench_id not in cache]
+        if missing:
+            # Query while the weather gate is checked; dropped if it is not sunny
+            fetch = asyncio.create_task(get_bench_status_batch(missing, rounded_time))
+
+        if not await check_weather_sunny():
+            _discard(fetch)
+            results[key] = dict.fromkeys(bench_ids, WEATHER_GATED_STATUS[:2])
+            return dict.fromkeys(bench_ids, WEATHER_GATED_STATUS)
+
+        if fetch is not None:
+            await _resolve_sun_statuses(
+                [(row['bench_id'], row['lat'], row['lon'], row['exposed']) for row in await fetch],
+                rounded_time,
+                cache,
+            )
 
-            if clear_sky_exposed is None:
-                result[bench_id] = ("unknown", None, None)
-                continue
+        resolved = {bench_id: cache[bench_id] for bench_id in result if bench_id in cache}
+        for bench_id, cached in resolved.items():
+            result[bench_id] = _with_remaining_minutes(*cached, now_ts)
 
-            bench = await get_bench_by_id(bench_id)
-            if bench is None:
-                result[bench_id] = ("unknown", None, None)
-                continue
+        # A bench left unknown by a failed lookup is retried on the next request
+        if len(resolved) == len(result):
+            results[key] = resolved
+        return result
 
-            lat = bench['lat']
-            lon = bench['lon']
+    except Exception as e:
+        _discard(fetch)
+        logger.error("Error batch getting sun status: %s", e)
+        return dict.fromkeys(bench_ids, UNKNOWN_STATUS)
 
-            is_weather_sunny = await is_sunny_at_time(lat, lon, rounded_time)
 
-            is_effectively_sunny = (
-                is_weather_sunny is True and clear_sky_exposed
-            )
-            effective_status = "sunny" if is_effectively_sunny else "shady"
+async def get_benches_with_sun_status(
+    lat: float, lon: float, radius: float, limit: Optional[int] = None
+) -> Tuple[list, dict[int, Tuple[str, Optional[datetime], Optional[int]]]]:
+    """
+    Get benches within a radius together with their current sun status.
+    Bench rows and clear-sky exposure come from a single query; when the
+    current-weather gate reports no sun every bench is shady.
 
-            next_change = await get_next_sun_change_with_weather(
-                bench_id, lat, lon, rounded_time, is_effectively_sunny
-            )
+    Args:
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters
+        limit: Maximum number of nearest benches (None for all)
 
-            if next_change:
-                if next_change.tzinfo is None:
-                    next_change = next_change.replace(tzinfo=timezone.utc)
-                time_diff = next_change - now
-                remaining_minutes = int(time_diff.total_seconds() / 60)
-                result[bench_id] = (effective_status, next_change, remaining_minutes)
-            else:
-                result[bench_id] = (effective_status, None, None)
+    Returns:
+        Tuple of (benches, status_map) where benches are the bench records
+        from get_benches_with_status and status_map maps bench_id to
+        (status, sun_until, remaining_minutes). Statuses fall back to
+        unknown if they cannot be resolved; a failing bench query raises.
+    """
+    now_ts = time.time()
+    # The floored minute keys the caches; countdowns use the exact time
+    now = minute_start(int(now_ts) // 60)
+    rounded_time = round_to_hour(now)
 
-        for bench_id in bench_ids:
-            if bench_id not in result:
-                result[bench_id] = ("unknown", None, None)
+    benches, weather_sunny = await asyncio.gather(
+        get_benches_with_status(lat, lon, radius, rounded_time, limit),
+        check_weather_sunny(),
+    )
+    if not weather_sunny:
+        return benches, dict.fromkeys((bench['id'] for bench in benches), WEATHER_GATED_STATUS)
 
-        return result
+    cache = _cached_statuses(now)
 
+    try:
+        await _resolve_sun_statuses(
+            [
+                (bench['id'], bench['lat'], bench['lon'], bench['exposed'])
+                for bench in benches
+                if bench['id'] not in cache
+            ],
+            rounded_time,
+            cache,
+        )
     except Exception as e:
-        logger.error(f"Error batch getting sun status: {e}")
-        for bench_id in bench_ids:
-            result[bench_id] = ("unknown", None, None)
-        return result
+        logger.error("Error getting sun status for benches near (%s, %s): %s", lat, lon, e)
+        return benches, dict.fromkeys((bench['id'] for bench in benches), UNKNOWN_STATUS)
+
+    status_map = {}
+    for bench in benches:
+        cached = cache.get(bench['id'])
+        status_map[bench['id']] = (
+            UNKNOWN_STATUS if cached is None else _with_remaining_minutes(*cached, now_ts)
+        )
+
+    return benches, status_map
+
+
+def _hourly_weather(sunny_hours: dict[int, bool], first_epoch: int, hours: int) -> np.ndarray:
+    """
+    Align a forecast epoch -> sunny mapping to `hours` hourly probes from `first_epoch`.
+
+    Returns:
+        int8 array with 1 (sunny), 0 (cloudy) or -1 (no forecast) per hour
+    """
+    weather = np.full(hours, -1, dtype=np.int8)
+    if not sunny_hours:
+        return weather
+
+    epochs = np.fromiter(sunny_hours.keys(), dtype=np.int64, count=len(sunny_hours))
+    sunny = np.fromiter(sunny_hours.values(), dtype=np.int8, count=len(sunny_hours))
+    offset, remainder = np.divmod(epochs - first_epoch, 3600)
+    on_probe = (remainder == 0) & (offset >= 0) & (offset < hours)
+    weather[offset[on_probe]] = sunny[on_probe]
+    return weather
 
 
 async def get_next_sun_change_with_weather(
@@ -108,7 +359,8 @@ async def get_next_sun_change_with_weather(
     lat: float,
     lon: float,
     current_time: datetime,
-    current_is_sunny: bool
+    current_is_sunny: bool,
+    sunny_hours: Optional[dict[int, bool]] = None,
 ) -> Optional[datetime]:
     """
     Get next sun status change considering both clear-sky data and weather forecasts.
@@ -123,46 +375,51 @@ async def get_next_sun_change_with_weather(
         lon: Bench longitude
         current_time: Current time
         current_is_sunny: Current effective sunny status
+        sunny_hours: Prefetched forecast epoch -> sunny for the bench's region
+            covering the search window; loaded here if None
 
     Returns:
         Timestamp of next status change, or None
     """
     now = datetime.now(timezone.utc)
-    search_end = now + timedelta(hours=48)
-
-    target_status = not current_is_sunny
-    candidate_times = []
+    search_end = now + timedelta(hours=WEATHER_SEARCH_HOURS)
 
     rounded_time = current_time.replace(minute=0, second=0, microsecond=0)
-    check_time = rounded_time + timedelta(hours=1)
-
-    while check_time < search_end:
-        clear_sky_exposed = await get_current_exposure(bench_id, check_time)
-        if clear_sky_exposed is None:
-            check_time += timedelta(hours=1)
-            continue
-
-        is_weather_sunny = await is_sunny_at_time(lat, lon, check_time)
-
-        is_effectively_sunny = (
-            is_weather_sunny is True and clear_sky_exposed
+    first_check = rounded_time + timedelta(hours=1)
+    hours = max(0, math.ceil((search_end - first_check).total_seconds() / 3600))
+
+    # Clear-sky exposure comes from the in-memory matrix and the forecast for
+    # the whole window from one query; the search below does no further I/O
+    if sunny_hours is None:
+        matrix, sunny_hours = await asyncio.gather(
+            get_exposure_matrix(),
+            get_sunny_hours_between(lat, lon, first_check, search_end),
         )
-
-        if target_status:
-            if is_effectively_sunny:
-                return check_time
-            elif is_weather_sunny is None and not clear_sky_exposed:
-                candidate_times.append(check_time)
-        else:
-            if not is_effectively_sunny:
-                return check_time
-            elif is_weather_sunny is None and clear_sky_exposed:
-                candidate_times.append(check_time)
-
-        check_time += timedelta(hours=1)
-
-    if candidate_times:
-        return candidate_times[0]
+    else:
+        matrix = await get_exposure_matrix()
+    hourly_exposure = matrix.hourly(bench_id, first_check, hours)
+    first_epoch = int(first_check.timestamp())
+
+    weather = _hourly_weather(sunny_hours, first_epoch, hours)
+
+    known = hourly_exposure != UNKNOWN
+    clear_sky_exposed = hourly_exposure == 1
+    effectively_sunny = clear_sky_exposed & (weather == 1)
+
+    if current_is_sunny:
+        # Anything short of sun under a sunny forecast ends the sunny spell
+        changes = known & ~effectively_sunny
+        candidates = np.zeros(hours, dtype=bool)
+    else:
+        changes = known & effectively_sunny
+        # Shady hours without a forecast are the fallback guess
+        candidates = known & ~clear_sky_exposed & (weather == -1)
+
+    # Index of the first hit in one pass; the fallback is only scanned if needed
+    for hits in (changes, candidates):
+        first = np.flatnonzero(hits)[:1]
+        if first.size:
+            return first_check + timedelta(hours=int(first[0]))
 
     return None
 
@@ -173,9 +430,17 @@ async def get_bench_sun_status(
     """
     Get current sun status for a bench with weather-aware predictions.
 
+    The bench's coordinates, clear-sky exposure and next clear-sky change
+    come from a single query that runs concurrently with the
+    current-weather gate; when it is not sunny in Graz the bench is shady
+    and the query result is dropped. The weather-adjusted result is kept
+    in the shared 10-minute status cache.
+
     Args:
         bench_id: Bench ID
-        skip_weather_check: If True, skip weather gate (for testing/debugging)
+        skip_weather_check: If True, report clear-sky status from the
+            exposure matrix without the weather gate, forecast or
+            database (for testing/debugging)
 
     Returns:
         Tuple of (status, sun_until, remaining_minutes)
@@ -183,47 +448,62 @@ async def get_bench_sun_status(
         - sun_until: Timestamp when status changes to opposite (considering weather)
         - remaining_minutes: Minutes until status changes (or None)
     """
-    now = datetime.now(timezone.utc)
-    rounded_time = round_to_hour(now)
-
-    try:
-        bench = await get_bench_by_id(bench_id)
-        if bench is None:
-            logger.warning(f"Bench {bench_id} not found")
-            return "unknown", None, None
+    if skip_weather_check:
+        # Clear-sky status needs neither coordinates nor forecasts
+        return (await get_bench_sun_status_batch([bench_id], skip_weather_check=True))[bench_id]
 
-        lat = bench['lat']
-        lon = bench['lon']
-
-        clear_sky_exposed = await get_current_exposure(bench_id, rounded_time)
+    now_ts = time.time()
+    # The floored minute keys the caches; countdowns use the exact time
+    now = minute_start(int(now_ts) // 60)
+    rounded_time = round_to_hour(now)
+    fetch = None
 
-        if clear_sky_exposed is None:
-            logger.warning(f"No exposure data for bench {bench_id} at {rounded_time}")
-            return "unknown", None, None
+    results = _cached_results(now)
+    key = frozenset((bench_id,))
+    if key in results:
+        return _with_remaining_minutes(*results[key][bench_id], now_ts)
 
-        is_weather_sunny = await is_sunny_at_time(lat, lon, rounded_time)
+    try:
+        cache = _cached_statuses(now)
+        cached = cache.get(bench_id)
+        if cached is None:
+            # Query while the weather gate is checked; dropped if it is not sunny
+            fetch = asyncio.create_task(get_bench_status_single(bench_id, rounded_time))
+
+        if not await check_weather_sunny():
+            _discard(fetch)
+            results[key] = {bench_id: WEATHER_GATED_STATUS[:2]}
+            return WEATHER_GATED_STATUS
+
+        if cached is not None:
+            effective_status, next_change = cached
+        else:
+            bench = await fetch
+            if bench is None:
+                logger.warning("Bench %s not found", bench_id)
+                return "unknown", None, None
 
-        is_effectively_sunny = (
-            is_weather_sunny is True and clear_sky_exposed
-        )
-        effective_status = "sunny" if is_effectively_sunny else "shady"
+            clear_sky_exposed = bench['exposed']
+            if clear_sky_exposed is None:
+                logger.warning("No exposure data for bench %s at %s", bench_id, rounded_time)
+                return "unknown", None, None
 
-        next_change = await get_next_sun_change_with_weather(
-            bench_id, lat, lon, rounded_time, is_effectively_sunny
+            await _resolve_sun_statuses(
+                [(bench_id, bench['lat'], bench['lon'], clear_sky_exposed)], rounded_time, cache
+            )
+            cached = cache.get(bench_id)
+            if cached is None:
+                return "unknown", None, None
+            effective_status, next_change = cached
+
+        # timestamptz columns and the resolver both yield tz-aware datetimes
+        _, next_change, remaining_minutes = _with_remaining_minutes(
+            effective_status, next_change, now_ts
         )
-
-        if next_change:
-            if next_change.tzinfo is None:
-                next_change = next_change.replace(tzinfo=timezone.utc)
-
-            time_diff = next_change - now
-            remaining_minutes = int(time_diff.total_seconds() / 60)
-            if remaining_minutes < 0:
-                remaining_minutes = None
-            return effective_status, next_change, remaining_minutes
-        else:
-            return effective_status, None, None
+        results[key] = {bench_id: (effective_status, next_change)}
+        return effective_status, next_change, remaining_minutes
 
     except Exception as e:
-        logger.error(f"Error getting sun status for bench {bench_id}: {e}")
+        _discard(fetch)
+        logger.error("Error getting sun status for bench %s: %s", bench_id, e)
         return "unknown", None, None
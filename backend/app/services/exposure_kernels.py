@@ -0,0 +1,54 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; callers fall back to NumPy
+    njit = None
+    prange = range
+
+NUMBA_AVAILABLE = njit is not None
+
+
+def _jit(fn):
+    """Compile with numba when it is installed, otherwise leave as Python"""
+    if njit is None:
+        return fn
+    return njit(parallel=True, cache=True, boundscheck=False)(fn)
+
+
+@_jit
+def scan_status(exposure, rows, now_slot, out_status, out_until):
+    """
+    Current exposure and next transition slot for the given matrix rows.
+
+    Args:
+        exposure: int8 (bench x slot) matrix with 1/0/-1 cells
+        rows: Row indices to scan
+        now_slot: Slot to read the current status from
+        out_status: Receives the current cell value per row
+        out_until: Receives the next slot with a different known value,
+            or -1 if there is none
+    """
+    n_slots = exposure.shape[1]
+    for i in prange(rows.shape[0]):
+        row = rows[i]
+        s = exposure[row, now_slot]
+        out_status[i] = s
+        out_until[i] = -1
+        if s == -1:
+            continue
+        t = now_slot + 1
+        while t < n_slots:
+            v = exposure[row, t]
+            if v != -1 and v != s:
+                out_until[i] = t
+                break
+            t += 1
+
+
+def scan_status_arrays(exposure: np.ndarray, rows: np.ndarray, now_slot: int):
+    """Run scan_status and return (status, until) arrays"""
+    out_status = np.empty(rows.shape[0], dtype=np.int8)
+    out_until = np.empty(rows.shape[0], dtype=np.int64)
+    scan_status(exposure, rows, now_slot, out_status, out_until)
+    return out_status, out_until
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.db.queries import get_data_window, get_exposure_since
+from app.services.exposure_kernels import NUMBA_AVAILABLE, scan_status_arrays
+
+logger = logging.getLogger(__name__)
+
+SLOT_SECONDS = 600
+SLOTS_PER_HOUR = 3600 // SLOT_SECONDS
+
+# Precomputation runs weekly, so the matrix is reloaded when the data
+# window's end moves; the TTL only drops slots that have passed
+MATRIX_TTL_SECONDS = 6 * 3600
+
+UNKNOWN = -1
+
+LANE_BITS = 64
+_ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class ExposureMatrix:
+    """
+    Precomputed clear-sky exposure held in memory as a (bench x slot) matrix.
+
+    Each cell is 1 (sunny), 0 (shady) or -1 (no data). Slot 0 starts at
+    `start_epoch` and slots are 10 minutes apart.
+    """
+
+    def __init__(self, start_epoch: int, bench_ids: list[int], exposure: np.ndarray):
+        self.start_epoch = start_epoch
+        self.exposure = exposure
+        self.index = {bench_id: row for row, bench_id in enumerate(bench_ids)}
+        # Bit-packed copies (64 slots per uint64 lane) for transition scans
+        self.sunny_bits = _pack_lanes(exposure == 1)
+        self.known_bits = _pack_lanes(exposure != UNKNOWN)
+
+    @classmethod
+    def from_bench_arrays(cls, rows) -> "ExposureMatrix":
+        """Build the matrix from one (bench_id, epochs[], exposed[]) row per bench"""
+        rows = [r for r in rows if r['epochs']]
+        if not rows:
+            return cls(0, [], np.full((0, 0), UNKNOWN, dtype=np.int8))
+
+        lengths = np.fromiter((len(r['epochs']) for r in rows), dtype=np.int64, count=len(rows))
+        epoch_col = np.concatenate([np.asarray(r['epochs'], dtype=np.int64) for r in rows])
+        exposed_col = np.concatenate([np.asarray(r['exposed'], dtype=np.int8) for r in rows])
+        bench_rows = np.repeat(np.arange(len(rows)), lengths)
+
+        start_epoch = int(epoch_col.min())
+        slots = (epoch_col - start_epoch) // SLOT_SECONDS
+
+        exposure = np.full((len(rows), int(slots.max()) + 1), UNKNOWN, dtype=np.int8)
+        exposure[bench_rows, slots] = exposed_col
+        return cls(start_epoch, [r['bench_id'] for r in rows], exposure)
+
+    @property
+    def n_slots(self) -> int:
+        return self.exposure.shape[1]
+
+    def slot_of(self, ts: datetime) -> int:
+        """Slot index for a timestamp (may fall outside the matrix)"""
+        return (int(ts.timestamp()) - self.start_epoch) // SLOT_SECONDS
+
+    def time_of(self, slot: int) -> datetime:
+        """Timestamp at the start of a slot"""
+        return datetime.fromtimestamp(self.start_epoch + slot * SLOT_SECONDS, tz=timezone.utc)
+
+    def hourly(self, bench_id: int, start: datetime, hours: int) -> np.ndarray:
+        """
+        Exposure at `start` and each following full hour.
+
+        Returns:
+            int8 array of length `hours` with 1/0/-1 per hour
+        """
+        out = np.full(hours, UNKNOWN, dtype=np.int8)
+        row = self.index.get(bench_id)
+        if row is None:
+            return out
+
+        slots = self.slot_of(start) + np.arange(hours) * SLOTS_PER_HOUR
+        valid = (slots >= 0) & (slots < self.n_slots)
+        out[valid] = self.exposure[row, slots[valid]]
+        return out
+
+    def status(
+        self, bench_ids: list[int], ts: datetime
+    ) -> dict[int, Tuple[Optional[bool], Optional[datetime]]]:
+        """
+        Current clear-sky exposure and next change for many benches at once.
+
+        Returns:
+            Dict mapping bench_id to (exposed, next_change_ts); exposed is
+            None when there is no data for the bench at `ts`
+        """
+        result = {bench_id: (None, None) for bench_id in bench_ids}
+        slot = self.slot_of(ts)
+        if not bench_ids or slot < 0 or slot >= self.n_slots:
+            return result
+
+        rows = np.fromiter(
+            (self.index.get(bench_id, -1) for bench_id in bench_ids),
+            dtype=np.int64,
+            count=len(bench_ids),
+        )
+        known = rows >= 0
+        rows = rows[known]
+
+        if NUMBA_AVAILABLE:
+            current, next_slot = scan_status_arrays(self.exposure, rows, slot)
+        else:
+            current = self.exposure[rows, slot]
+            next_slot = self.next_transition_slots(rows, slot, current == 1)
+
+        for i, bench_id in enumerate(np.asarray(bench_ids)[known].tolist()):
+            if current[i] == UNKNOWN:
+                continue
+            next_change = self.time_of(int(next_slot[i])) if next_slot[i] >= 0 else None
+            result[bench_id] = (bool(current[i]), next_change)
+
+        return result
+
+    def next_transition_slots(
+        self, rows: np.ndarray, slot: int, current: np.ndarray
+    ) -> np.ndarray:
+        """
+        First slot after `slot` whose known exposure differs from `current`.
+
+        Scans 64 slots per uint64 word: XOR against the current state leaves
+        set bits exactly where exposure differs, and the lowest set bit of
+        the first non-zero lane is the transition.
+
+        Returns:
+            int64 array of slot indices, -1 where there is no transition
+        """
+        flip = np.where(current, _ALL_ONES, np.uint64(0))
+        diff = (self.sunny_bits[rows] ^ flip[:, None]) & self.known_bits[rows]
+
+        start = slot + 1
+        first_lane = start // LANE_BITS
+        diff[:, :first_lane] = 0
+        if first_lane < diff.shape[1]:
+            diff[:, first_lane] &= ~np.uint64((1 << (start % LANE_BITS)) - 1)
+
+        nonzero = diff != 0
+        has_change = nonzero.any(axis=1)
+        lane = nonzero.argmax(axis=1)
+        word = diff[np.arange(len(rows)), lane]
+        lowest_bit = word & (~word + np.uint64(1))
+        bit = np.log2(np.where(has_change, lowest_bit, np.uint64(1))).astype(np.int64)
+        return np.where(has_change, lane * LANE_BITS + bit, -1)
+
+    def next_transition_slot(self, bench_id: int, slot: int) -> Optional[int]:
+        """Next clear-sky transition slot for a single bench, or None"""
+        row = self.index.get(bench_id)
+        if row is None or slot < 0 or slot >= self.n_slots:
+            return None
+        current = self.exposure[row, slot]
+        if current == UNKNOWN:
+            return None
+        next_slot = self.next_transition_slots(np.array([row]), slot, np.array([current == 1]))
+        return int(next_slot[0]) if next_slot[0] >= 0 else None
+
+
+def _pack_lanes(bits: np.ndarray) -> np.ndarray:
+    """Pack a (rows x slots) boolean matrix into (rows x lanes) uint64 words"""
+    n_rows, n_slots = bits.shape
+    n_lanes = max(1, -(-n_slots // LANE_BITS))
+    padded = np.zeros((n_rows, n_lanes * LANE_BITS), dtype=bool)
+    padded[:, :n_slots] = bits
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return packed.view(np.dtype("<u8")).reshape(n_rows, n_lanes)
+
+
+_matrix: Optional[ExposureMatrix] = None
+_loaded_at: float = 0.0
+# End of the precomputed data window the matrix was loaded from
+_window_end: Optional[datetime] = None
+_loading: Optional[asyncio.Task] = None
+
+
+async def _load_matrix() -> ExposureMatrix:
+    """Load exposure from the current hour onwards into memory"""
+    global _matrix, _loaded_at, _window_end
+
+    _, window_end = await get_data_window()
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    rows = await get_exposure_since(start)
+    _matrix = ExposureMatrix.from_bench_arrays(rows)
+    _loaded_at = time.monotonic()
+    _window_end = window_end
+    logger.info(
+        "Loaded exposure matrix: %s benches x %s slots", _matrix.exposure.shape[0], _matrix.n_slots
+    )
+    return _matrix
+
+
+def _clear_loading(task: asyncio.Task) -> None:
+    global _loading
+
+    if _loading is task:
+        _loading = None
+    if not task.cancelled():
+        task.exception()
+
+
+async def get_exposure_matrix() -> ExposureMatrix:
+    """
+    Get the in-memory exposure matrix, reloading it when new precomputed
+    data has been loaded (the data window's end moved) or when older than
+    MATRIX_TTL_SECONDS. Concurrent callers share a single reload.
+    """
+    global _loading
+
+    if _matrix is not None and time.monotonic() - _loaded_at < MATRIX_TTL_SECONDS:
+        try:
+            _, window_end = await get_data_window()
+        except Exception as e:
+            logger.warning("Could not check exposure data window, using loaded matrix: %s", e)
+            return _matrix
+        if window_end == _window_end:
+            return _matrix
+
+    if _loading is None:
+        _loading = asyncio.create_task(_load_matrix())
+        _loading.add_done_callback(_clear_loading)
+
+    try:
+        return await asyncio.shield(_loading)
+    except Exception as e:
+        if _matrix is not None:
+            logger.warning("Exposure matrix reload failed, using previous data: %s", e)
+            return _matrix
+        raise
@@ -0,0 +1,39 @@
+import aiohttp
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Outbound connection limits for the shared session
+HTTP_CONNECTION_LIMIT = 20
+HTTP_DNS_CACHE_TTL = 300
+
+# Default total timeout per request; callers may pass their own
+HTTP_TIMEOUT_SECONDS = 10
+
+# Global HTTP session, kept open so connections, TLS sessions and DNS
+# lookups are reused across weather API calls
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            ),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS),
+        )
+    return _session
+
+
+async def close_http_session():
+    """Close the shared HTTP session"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+        logger.info("HTTP session closed")
@@ -2,12 +2,15 @@ import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 
 from app.config import settings
 from app.services.weather_openmeteo import (
+    OPENMETEO_CACHE_TTL,
     update_all_region_forecasts,
     cleanup_old_forecasts,
+    load_cached_forecasts,
 )
 
 logger = logging.getLogger(__name__)
@@ -22,14 +25,14 @@ async def weather_update_job():
 
         results = await update_all_region_forecasts()
         total = sum(results.values())
-        logger.info(f"Weather update complete: {total} hours across {len(results)} regions")
+        logger.info("Weather update complete: %s hours across %s regions", total, len(results))
 
         deleted = await cleanup_old_forecasts(168)
         if deleted > 0:
-            logger.info(f"Cleaned up {deleted} old forecast records")
+            logger.info("Cleaned up %s old forecast records", deleted)
 
     except Exception as e:
-        logger.error(f"Weather update job failed: {e}")
+        logger.error("Weather update job failed: %s", e)
 
 
 def start_scheduler():
@@ -45,7 +48,39 @@ def start_scheduler():
     )
 
     scheduler.start()
-    logger.info(f"Weather scheduler started (interval: {interval_minutes} minutes)")
+    logger.info("Weather scheduler started (interval: %s minutes)", interval_minutes)
+
+
+def trigger_weather_update_now() -> Optional[datetime]:
+    """
+    Move the scheduled weather update forward so it runs right away.
+
+    The update runs as the regular scheduler job, so it never overlaps
+    with a periodic run.
+
+    Returns:
+        The new run time, or None if the scheduler job is not configured
+    """
+    job = scheduler.get_job("weather_update")
+    if job is None:
+        return None
+
+    job.modify(next_run_time=datetime.now(timezone.utc))
+    logger.info("Weather update job moved forward to run now")
+    return job.next_run_time
+
+
+async def warm_weather_caches():
+    """
+    Serve stored forecasts right after startup and refresh them if stale.
+
+    Forecasts persisted in weather_cache are loaded into memory; when they
+    are missing or older than the cache TTL, the scheduled update is moved
+    forward so fresh data replaces them without waiting a full interval.
+    """
+    oldest = await load_cached_forecasts()
+    if oldest is None or (datetime.now(timezone.utc) - oldest).total_seconds() >= OPENMETEO_CACHE_TTL:
+        trigger_weather_update_now()
 
 
 def stop_scheduler():
@@ -1,37 +1,63 @@
-import aiohttp
+import asyncio
 import logging
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Optional, Tuple
 
+import aiohttp
+import orjson
+
 from app.config import settings
 from app.models.weather import WeatherStatus
+from app.services.http import get_http_session
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache
+# Simple in-memory cache for the configured station (one station per process)
 _weather_cache: Optional[WeatherStatus] = None
-_cache_time: Optional[datetime] = None
+# time.monotonic() when _weather_cache was stored
+_cache_time: Optional[float] = None
+
+# In-flight API fetch shared by concurrent cache misses
+_inflight: Optional[asyncio.Task] = None
 
-# Station name mapping
-STATION_NAMES = {
+# Latest SO (sunshine seconds) value in a TAWES station response
+_SO_PATH = ("features", 0, "properties", "parameters", "SO", "data", 0)
+
+# Station name mapping (read-only)
+STATION_NAMES = MappingProxyType({
     "11290": "Graz Universitaet",
     "11240": "Graz-Thalerhof-Flughafen",
     "11238": "Graz/Strassgang",
     "11291": "Graz Universitaet/Heinrichstrasse",
-}
+})
+
+
+def _cached_status() -> Optional[WeatherStatus]:
+    """Cached weather for the configured station, fresh or stale"""
+    if _weather_cache is None or _weather_cache.station_id != settings.geosphere_station_id:
+        return None
+    return _weather_cache
+
+
+def _cache_age() -> Optional[float]:
+    """Seconds since the configured station's reading was cached, or None"""
+    if _cached_status() is None or _cache_time is None:
+        return None
+    return time.monotonic() - _cache_time
 
 
 def _is_cache_valid() -> bool:
     """Check if cached weather data is still valid"""
-    if _weather_cache is None or _cache_time is None:
-        return False
-
-    age = (datetime.now(timezone.utc) - _cache_time).total_seconds()
-    return age < settings.weather_cache_ttl
+    age = _cache_age()
+    return age is not None and age < settings.weather_cache_ttl
 
 
+@lru_cache(maxsize=128)
 def _create_status_message(is_sunny: bool, sunshine_seconds: int) -> str:
-    """Create human-readable status message"""
+    """Create human-readable status message (SO only takes a few hundred values)"""
     if is_sunny:
         minutes = sunshine_seconds // 60
         if minutes >= 10:
@@ -42,10 +68,13 @@ def _create_status_message(is_sunny: bool, sunshine_seconds: int) -> str:
         return "Overcast/cloudy - no benches currently in direct sunlight"
 
 
-async def fetch_weather_from_api() -> WeatherStatus:
+async def fetch_weather_from_api(session: Optional[aiohttp.ClientSession] = None) -> WeatherStatus:
     """
     Fetch current weather from GeoSphere TAWES API
 
+    Args:
+        session: HTTP session to use; defaults to the shared app session
+
     Returns:
         WeatherStatus with current sunshine data
 
@@ -55,16 +84,16 @@ async def fetch_weather_from_api() -> WeatherStatus:
     url = f"{settings.geosphere_api_url}/v1/station/current/tawes-v1-10min"
     params = {"parameters": "SO", "station_ids": settings.geosphere_station_id}
 
-    logger.info(f"Fetching weather from GeoSphere API: {url}")
+    logger.info("Fetching weather from GeoSphere API: %s", url)
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params, timeout=10) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"GeoSphere API error {response.status}: {error_text}")
-                raise Exception(f"GeoSphere API returned status {response.status}")
+    session = session or get_http_session()
+    async with session.get(url, params=params) as response:
+        if response.status != 200:
+            error_text = await response.text()
+            logger.error("GeoSphere API error %s: %s", response.status, error_text)
+            raise Exception(f"GeoSphere API returned status {response.status}")
 
-            data = await response.json()
+        data = orjson.loads(await response.read())
 
     # Parse GeoJSON response
     try:
@@ -77,25 +106,22 @@ async def fetch_weather_from_api() -> WeatherStatus:
         else:
             api_timestamp = datetime.now(timezone.utc)
 
-        # Extract sunshine duration from features
-        features = data.get("features", [])
-        if not features:
+        # Extract sunshine duration from the first feature
+        if not data.get("features"):
             raise ValueError("No features in API response")
 
-        feature = features[0]
-        properties = feature.get("properties", {})
-        parameters = properties.get("parameters", {})
-        so_data = parameters.get("SO", {})
-        sunshine_data = so_data.get("data", [])
-
-        if not sunshine_data:
+        sunshine = data
+        try:
+            for key in _SO_PATH:
+                sunshine = sunshine[key]
+        except (KeyError, IndexError, TypeError):
             raise ValueError("No sunshine data in API response")
 
-        sunshine_seconds = int(sunshine_data[0]) if sunshine_data[0] is not None else 0
+        sunshine_seconds = int(sunshine) if sunshine is not None else 0
         is_sunny = sunshine_seconds > 0
 
         station_id = settings.geosphere_station_id
-        station_name = STATION_NAMES.get(station_id, f"Station {station_id}")
+        station_name = STATION_NAMES.get(station_id) or f"Station {station_id}"
 
         status = WeatherStatus(
             is_sunny=is_sunny,
@@ -108,46 +134,87 @@ async def fetch_weather_from_api() -> WeatherStatus:
         )
 
         logger.info(
-            f"Weather fetched: is_sunny={is_sunny}, sunshine_seconds={sunshine_seconds}"
+            "Weather fetched: is_sunny=%s, sunshine_seconds=%s", is_sunny, sunshine_seconds
         )
         return status
 
     except (KeyError, IndexError, ValueError) as e:
-        logger.error(f"Error parsing GeoSphere API response: {e}")
+        logger.error("Error parsing GeoSphere API response: %s", e)
         raise Exception(f"Failed to parse GeoSphere API response: {e}")
 
 
+async def _refresh_weather_cache() -> WeatherStatus:
+    """Fetch fresh weather data and store it in the cache"""
+    global _weather_cache, _cache_time
+
+    status = await fetch_weather_from_api()
+    _weather_cache = status
+    _cache_time = time.monotonic()
+    return status
+
+
+def _clear_inflight(task: asyncio.Task) -> None:
+    """Forget a finished fetch so the next miss starts a new one"""
+    global _inflight
+
+    if _inflight is task:
+        _inflight = None
+    if not task.cancelled():
+        # Mark the exception as retrieved even if every waiter went away
+        error = task.exception()
+        if error is not None:
+            logger.warning("Weather refresh failed: %s", error)
+
+
+def _start_refresh() -> asyncio.Task:
+    """Start an API fetch, or join the one already in flight"""
+    global _inflight
+
+    if _inflight is None:
+        _inflight = asyncio.create_task(_refresh_weather_cache())
+        _inflight.add_done_callback(_clear_inflight)
+    return _inflight
+
+
 async def get_current_weather(force_refresh: bool = False) -> Tuple[WeatherStatus, bool]:
     """
     Get current weather status, using cache if valid
 
+    Concurrent cache misses share a single API request instead of each
+    fetching from GeoSphere. Within weather_cache_grace seconds past the
+    TTL the cached reading is returned straight away and refreshed in the
+    background.
+
     Args:
         force_refresh: If True, bypass cache and fetch fresh data
 
     Returns:
         Tuple of (WeatherStatus, cache_hit)
     """
-    global _weather_cache, _cache_time
-
     # Check cache first (unless force refresh)
-    if not force_refresh and _is_cache_valid():
-        logger.debug("Returning cached weather data")
-        return _weather_cache, True
+    age = None if force_refresh else _cache_age()
+    if age is not None:
+        if age < settings.weather_cache_ttl:
+            logger.debug("Returning cached weather data")
+            return _weather_cache, True
+        if age < settings.weather_cache_ttl + settings.weather_cache_grace:
+            logger.debug("Returning stale weather data while refreshing")
+            _start_refresh()
+            return _weather_cache, True
 
-    # Fetch fresh data
+    # Fetch fresh data, joining a fetch that is already in flight
     try:
-        status = await fetch_weather_from_api()
-        _weather_cache = status
-        _cache_time = datetime.now(timezone.utc)
+        status = await asyncio.shield(_start_refresh())
         return status, False
 
     except Exception as e:
-        logger.error(f"Failed to fetch weather: {e}")
+        logger.error("Failed to fetch weather: %s", e)
 
         # Return stale cache if available
-        if _weather_cache is not None:
+        stale = _cached_status()
+        if stale is not None:
             logger.warning("Returning stale cached weather data due to API error")
-            return _weather_cache, True
+            return stale, True
 
         # No cache available, raise error
         raise
@@ -164,7 +231,7 @@ async def is_sunny() -> bool:
         status, _ = await get_current_weather()
         return status.is_sunny
     except Exception as e:
-        logger.error(f"Could not determine sunshine status: {e}")
+        logger.error("Could not determine sunshine status: %s", e)
         # Conservative default: assume not sunny if we can't determine
         return False
 
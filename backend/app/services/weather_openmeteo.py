@@ -1,27 +1,88 @@
 import asyncio
+import bisect
 import logging
+import math
+import time
 from datetime import datetime, timezone, timedelta
+from functools import partial
+from itertools import groupby
 from typing import Optional, List, Dict, Tuple
-import json
 
 import aiohttp
+import numpy as np
+import orjson
+from yarl import URL
 from app.config import settings
-from app.db.connection import get_pool
+from app.db.connection import get_pool, get_prepared, register_hot_query
+from app.services.http import get_http_session
 
 logger = logging.getLogger(__name__)
 
 OPENMETEO_BASE_URL = "https://api.open-meteo.com/v1/forecast"
+OPENMETEO_URL = URL(OPENMETEO_BASE_URL)
 
 CLOUD_COVER_THRESHOLD = 20
 
-OPENMETEO_CACHE_TTL = 300
-
-_region_cache: Dict[str, datetime] = {}
-_forecast_cache: Dict[Tuple[str, datetime], dict] = {}
-
-
-def _get_region_id(lat: float, lon: float) -> str:
-    return f"graz_{int(lat * 10)}_{int(lon * 10)}"
+# Weather regions are 1/REGION_GRID degree cells (0.2°). Must match
+# weather_region_id() in database/migrations/007_weather_region_grid.sql.
+REGION_GRID = 5
+
+# Forecast freshness window (OPENMETEO_CACHE_TTL env var, see app.config)
+OPENMETEO_CACHE_TTL = settings.openmeteo_cache_ttl
+
+FORECAST_CACHE_MAX_ENTRIES = 10000
+
+# Bulk region updates: parallel requests, and minimum spacing between their starts
+OPENMETEO_MAX_CONCURRENT = 4
+OPENMETEO_MIN_REQUEST_INTERVAL = 0.1
+
+# Forecast reads on the request path, prepared on every new pool connection
+CLOUD_COVER_AT_TIME_QUERY = register_hot_query("""
+    SELECT cloud_cover_percent, fetched_at
+    FROM weather_cache
+    WHERE region_id = $1
+      AND forecast_time = $2
+    ORDER BY fetched_at DESC
+    LIMIT 1
+""")
+
+WEATHER_WINDOW_QUERY = register_hot_query("""
+    SELECT region_id, forecast_time, cloud_cover_percent, fetched_at
+    FROM weather_cache
+    WHERE region_id = ANY($1::text[])
+      AND forecast_time BETWEEN $2 AND $3
+      AND cloud_cover_percent IS NOT NULL
+    ORDER BY region_id, forecast_time
+""")
+
+# is_sunny is generated as cloud_cover_percent < 20 (CLOUD_COVER_THRESHOLD);
+# filtering on it lets the partial idx_weather_cache_sunny index answer this
+NEXT_SUNNY_TIME_QUERY = register_hot_query("""
+    SELECT forecast_time
+    FROM weather_cache
+    WHERE region_id = $1
+      AND forecast_time > $2
+      AND forecast_time < $3
+      AND is_sunny
+    ORDER BY forecast_time
+    LIMIT 1
+""")
+
+# (region_id, forecast hour epoch) -> (monotonic time cached, cloud cover %).
+# Benches in one region share their forecast, so per-hour lookups are
+# answered from here instead of one weather_cache query per bench.
+_forecast_cache: Dict[Tuple[str, int], Tuple[float, Optional[int]]] = {}
+
+# region_id -> (first forecast epoch, last forecast epoch, sorted sunny epochs),
+# rebuilt from each fetched forecast so next-sunny lookups are a bisect.
+_sunny_index: Dict[str, Tuple[float, float, List[float]]] = {}
+
+# region_id -> in-flight forecast update shared by concurrent callers
+_region_updates: Dict[str, asyncio.Task] = {}
+
+
+def get_region_id(lat: float, lon: float) -> str:
+    return f"graz_{math.floor(lat * REGION_GRID)}_{math.floor(lon * REGION_GRID)}"
 
 
 def _is_cache_valid(cached_at: datetime) -> bool:
@@ -36,61 +97,72 @@ async def _fetch_openmeteo_forecast(lat: float, lon: float) -> Optional[dict]:
         "hourly": "cloudcover,sunshine_duration",
         "forecast_hours": 168,
         "timezone": "Europe/Vienna",
+        # Epoch seconds (always UTC) instead of local ISO strings: no parsing
+        "timeformat": "unixtime",
     }
 
-    url = f"{OPENMETEO_BASE_URL}?{ '&'.join(f'{k}={v}' for k, v in params.items()) }"
-
-    logger.info(f"Fetching weather forecast from Open-Meteo: lat={lat}, lon={lon}")
+    logger.info("Fetching weather forecast from Open-Meteo: lat=%s, lon=%s", lat, lon)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"Open-Meteo API error {response.status}: {error_text}")
-                    return None
+        async with get_http_session().get(
+            OPENMETEO_URL, params=params, timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error("Open-Meteo API error %s: %s", response.status, error_text)
+                return None
 
-                data = await response.json()
-                return data
+            data = orjson.loads(await response.read())
+            return data
 
     except asyncio.TimeoutError:
         logger.error("Open-Meteo API request timed out")
         return None
     except Exception as e:
-        logger.error(f"Error fetching Open-Meteo forecast: {e}")
+        logger.error("Error fetching Open-Meteo forecast: %s", e)
         return None
 
 
-async def _parse_forecast(data: dict) -> List[dict]:
+def _forecast_column(values: list, n: int) -> np.ndarray:
+    """Float column of length n; missing and null entries become NaN."""
+    column = np.full(n, np.nan)
+    m = min(n, len(values))
+    column[:m] = np.array(values[:m], dtype=float)
+    return column
+
+
+async def _parse_forecast(data: dict) -> Optional[Dict[str, np.ndarray]]:
+    """Turn the hourly Open-Meteo payload into columns.
+
+    Returns:
+        ``{"time": int64 epoch seconds, "cloud_cover": float %, "sunshine":
+        float seconds}`` with NaN where a value is missing, or None if the
+        payload has no hours.
+    """
     hourly = data.get("hourly", {})
     times = hourly.get("time", [])
-    cloudcover = hourly.get("cloudcover", [])
-    sunshine = hourly.get("sunshine_duration", [])
-
-    forecasts = []
-    for i, t in enumerate(times):
-        forecast_time = datetime.fromisoformat(t.replace("+02:00", "+02:00").replace("+01:00", "+01:00"))
-        cloudcover_val = cloudcover[i] if i < len(cloudcover) else None
-        sunshine_val = sunshine[i] if i < len(sunshine) else None
-
-        forecasts.append({
-            "forecast_time": forecast_time,
-            "cloud_cover_percent": cloudcover_val,
-            "sunshine_duration_seconds": sunshine_val,
-        })
+    if not times:
+        return None
 
-    return forecasts
+    n = len(times)
+    return {
+        "time": np.asarray(times, dtype=np.int64),
+        "cloud_cover": _forecast_column(hourly.get("cloudcover", []), n),
+        "sunshine": _forecast_column(hourly.get("sunshine_duration", []), n),
+    }
 
 
 async def _store_forecast_in_db(
-    region_id: str, lat: float, lon: float, forecasts: List[dict]
+    region_id: str, lat: float, lon: float, forecast: Dict[str, np.ndarray]
 ) -> int:
     pool = await get_pool()
-    stored = 0
 
+    # The columns go in as three arrays and are unnested server-side, so the
+    # whole forecast is one statement with no per-hour Python objects
     query = """
         INSERT INTO weather_cache (region_id, latitude, longitude, forecast_time, cloud_cover_percent, sunshine_duration_seconds, fetched_at)
-        VALUES ($1, $2, $3, $4, $5, $6, NOW())
+        SELECT $1, $2, $3, to_timestamp(f.epoch), nullif(f.cloud, 'NaN')::int, nullif(f.sunshine, 'NaN')::int, NOW()
+        FROM unnest($4::float8[], $5::float8[], $6::float8[]) AS f(epoch, cloud, sunshine)
         ON CONFLICT (region_id, forecast_time)
         DO UPDATE SET
             cloud_cover_percent = EXCLUDED.cloud_cover_percent,
@@ -99,39 +171,146 @@ async def _store_forecast_in_db(
     """
 
     try:
-        async with pool.acquire() as conn:
-            for f in forecasts:
-                if f["forecast_time"] is None:
-                    continue
-                await conn.execute(
-                    query,
-                    region_id,
-                    lat,
-                    lon,
-                    f["forecast_time"],
-                    f["cloud_cover_percent"],
-                    f["sunshine_duration_seconds"],
-                )
-                stored += 1
+        async with pool.acquire() as conn, conn.transaction():
+            # Forecasts can be refetched, so the commit need not wait for
+            # the WAL flush; a crash at worst loses the latest refresh
+            await conn.execute("SET LOCAL synchronous_commit TO OFF")
+            await conn.execute(
+                query,
+                region_id,
+                lat,
+                lon,
+                forecast["time"].astype(float).tolist(),
+                forecast["cloud_cover"].tolist(),
+                forecast["sunshine"].tolist(),
+            )
     except Exception as e:
-        logger.error(f"Error storing weather forecast in DB: {e}")
+        logger.error("Error storing weather forecast in DB: %s", e)
+        return 0
+
+    return len(forecast["time"])
+
+
+def _forecast_epoch(forecast_time: datetime) -> float:
+    # asyncpg stores naive datetimes as UTC; index them the same way
+    if forecast_time.tzinfo is None:
+        forecast_time = forecast_time.replace(tzinfo=timezone.utc)
+    return forecast_time.timestamp()
+
+
+def _cache_cloud_covers(
+    covers: Dict[Tuple[str, int], Optional[int]], age: float = 0.0
+) -> None:
+    """Remember cloud cover per (region_id, epoch) for OPENMETEO_CACHE_TTL seconds.
 
-    return stored
+    A whole forecast is stored with one clock read and at most one expiry
+    sweep. ``age`` is how old the values already are (seconds since they
+    were fetched).
+    """
+    now = time.monotonic()
+    if len(_forecast_cache) + len(covers) > FORECAST_CACHE_MAX_ENTRIES:
+        for key in [k for k, (cached_at, _) in _forecast_cache.items() if now - cached_at >= OPENMETEO_CACHE_TTL]:
+            del _forecast_cache[key]
+        if len(_forecast_cache) + len(covers) > FORECAST_CACHE_MAX_ENTRIES:
+            _forecast_cache.clear()
+    cached_at = now - age
+    _forecast_cache.update((key, (cached_at, cloud_cover)) for key, cloud_cover in covers.items())
+
+
+def _cache_cloud_cover(
+    region_id: str, epoch: int, cloud_cover: Optional[int], age: float = 0.0
+) -> None:
+    """Remember a single hour's cloud cover (see _cache_cloud_covers)."""
+    _cache_cloud_covers({(region_id, epoch): cloud_cover}, age)
+
+
+def _cached_cloud_cover(region_id: str, epoch: int) -> Tuple[bool, Optional[int]]:
+    """Look up an hour's cloud cover; ``(False, None)`` when absent or expired."""
+    entry = _forecast_cache.get((region_id, epoch))
+    if entry is None or time.monotonic() - entry[0] >= OPENMETEO_CACHE_TTL:
+        return False, None
+    return True, entry[1]
+
+
+def _index_sunny_hours(region_id: str, forecast: Dict[str, np.ndarray]) -> None:
+    """Replace the sorted sunny-hour index for a region from a fresh forecast."""
+    epochs = forecast["time"]
+    if not epochs.size:
+        return
+    # NaN cloud cover compares False, so hours without data are not sunny
+    sunny = np.sort(epochs[forecast["cloud_cover"] < CLOUD_COVER_THRESHOLD])
+    _sunny_index[region_id] = (float(epochs.min()), float(epochs.max()), sunny.astype(float).tolist())
+
+
+def _lookup_next_sunny(
+    region_id: str, from_time: datetime, end_time: datetime
+) -> Tuple[bool, Optional[datetime]]:
+    """Look up the next sunny hour in the in-process index.
+
+    Returns:
+        ``(hit, next_sunny)``; ``hit`` is False when the index does not cover
+        the requested window and the caller has to ask the database.
+    """
+    entry = _sunny_index.get(region_id)
+    if entry is None:
+        return False, None
+    first, last, sunny = entry
+    start = from_time.timestamp()
+    end = end_time.timestamp()
+    if start < first:
+        return False, None
+
+    i = bisect.bisect_right(sunny, start)
+    if i < len(sunny) and sunny[i] < end:
+        return True, datetime.fromtimestamp(sunny[i], timezone.utc)
+    if end <= last:
+        return True, None
+    return False, None
+
+
+def _clear_region_update(region_id: str, task: asyncio.Task) -> None:
+    """Forget a finished region update so the next caller starts a new one."""
+    if _region_updates.get(region_id) is task:
+        del _region_updates[region_id]
+    if not task.cancelled():
+        # Mark the exception as retrieved even if every waiter went away
+        task.exception()
 
 
 async def update_weather_for_region(lat: float, lon: float) -> Tuple[int, bool]:
-    region_id = _get_region_id(lat, lon)
+    """Fetch and store the forecast for the region containing (lat, lon).
+
+    Concurrent updates of one region (stale-cache refreshes from many
+    benches, the scheduler, the API) share a single Open-Meteo request.
+    """
+    region_id = get_region_id(lat, lon)
+
+    task = _region_updates.get(region_id)
+    if task is None:
+        task = asyncio.create_task(_update_region(region_id, lat, lon))
+        _region_updates[region_id] = task
+        task.add_done_callback(partial(_clear_region_update, region_id))
 
+    return await asyncio.shield(task)
+
+
+async def _update_region(region_id: str, lat: float, lon: float) -> Tuple[int, bool]:
     data = await _fetch_openmeteo_forecast(lat, lon)
     if data is None:
         return 0, False
 
-    forecasts = await _parse_forecast(data)
-    if not forecasts:
+    forecast = await _parse_forecast(data)
+    if forecast is None:
         return 0, False
 
-    stored = await _store_forecast_in_db(region_id, lat, lon, forecasts)
-    logger.info(f"Stored {stored} weather forecasts for region {region_id}")
+    stored = await _store_forecast_in_db(region_id, lat, lon, forecast)
+    if stored:
+        _index_sunny_hours(region_id, forecast)
+        _cache_cloud_covers({
+            (region_id, epoch): None if math.isnan(cloud_cover) else int(cloud_cover)
+            for epoch, cloud_cover in zip(forecast["time"].tolist(), forecast["cloud_cover"].tolist())
+        })
+    logger.info("Stored %s weather forecasts for region %s", stored, region_id)
 
     return stored, True
 
@@ -139,11 +318,12 @@ async def update_weather_for_region(lat: float, lon: float) -> Tuple[int, bool]:
 async def update_all_region_forecasts() -> Dict[str, int]:
     pool = await get_pool()
 
+    # One forecast per region, requested for the centre of its grid cell
     query = """
         SELECT DISTINCT ON (region_id)
-            'graz_' || floor(ST_Y(geom::geometry)::numeric * 10)::int || '_' || floor(ST_X(geom::geometry)::numeric * 10)::int as region_id,
-            floor(ST_Y(geom::geometry)::numeric * 10)::int / 10.0 as lat,
-            floor(ST_X(geom::geometry)::numeric * 10)::int / 10.0 as lon
+            'graz_' || floor(lat::numeric * $1)::int || '_' || floor(lon::numeric * $1)::int as region_id,
+            (floor(lat::numeric * $1) + 0.5) / $1 as lat,
+            (floor(lon::numeric * $1) + 0.5) / $1 as lon
         FROM benches
         WHERE geom IS NOT NULL
         ORDER BY region_id
@@ -152,64 +332,187 @@ async def update_all_region_forecasts() -> Dict[str, int]:
     results = {}
     try:
         async with pool.acquire() as conn:
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(query, REGION_GRID)
             regions = [dict(row) for row in rows]
     except Exception as e:
-        logger.error(f"Error fetching bench regions: {e}")
+        logger.error("Error fetching bench regions: %s", e)
         return results
 
-    for region in regions:
-        region_id = region["region_id"]
-        lat = float(region["lat"])
-        lon = float(region["lon"])
+    semaphore = asyncio.Semaphore(OPENMETEO_MAX_CONCURRENT)
+    loop = asyncio.get_running_loop()
+    next_start = loop.time()
+
+    async def update(region: dict) -> Tuple[str, int]:
+        nonlocal next_start
+        async with semaphore:
+            # Reserve the next free start slot; no await between read and write
+            now = loop.time()
+            start = max(now, next_start)
+            next_start = start + OPENMETEO_MIN_REQUEST_INTERVAL
+            await asyncio.sleep(start - now)
+
+            stored, success = await update_weather_for_region(
+                float(region["lat"]), float(region["lon"])
+            )
+            return region["region_id"], stored
+
+    return dict(await asyncio.gather(*(update(region) for region in regions)))
+
+
+async def load_cached_forecasts() -> Optional[datetime]:
+    """Hydrate the in-process forecast caches from weather_cache.
+
+    The table already persists the latest forecast per region across
+    restarts; loading it at startup means lookups are served from memory
+    straight away instead of waiting for the next Open-Meteo update.
+
+    Returns:
+        The oldest fetched_at among the loaded regions, or None if there
+        are no current forecasts stored.
+    """
+    pool = await get_pool()
+
+    query = """
+        SELECT
+            region_id,
+            extract(epoch FROM forecast_time)::bigint AS epoch,
+            cloud_cover_percent,
+            fetched_at
+        FROM weather_cache
+        WHERE forecast_time >= date_trunc('hour', NOW())
+        ORDER BY region_id, forecast_time
+    """
+
+    try:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query)
+    except Exception as e:
+        logger.error("Error loading cached forecasts: %s", e)
+        return None
 
-        stored, success = await update_weather_for_region(lat, lon)
-        results[region_id] = stored
+    oldest = None
+    now = datetime.now(timezone.utc)
+    for region_id, region_rows in groupby(rows, key=lambda row: row["region_id"]):
+        region_rows = list(region_rows)
+        forecast = {
+            "time": np.array([row["epoch"] for row in region_rows], dtype=np.int64),
+            "cloud_cover": np.array([row["cloud_cover_percent"] for row in region_rows], dtype=float),
+        }
+        _index_sunny_hours(region_id, forecast)
 
-        await asyncio.sleep(0.5)
+        fetched_at = min(row["fetched_at"] for row in region_rows)
+        age = (now - fetched_at).total_seconds()
+        _cache_cloud_covers(
+            {(region_id, row["epoch"]): row["cloud_cover_percent"] for row in region_rows}, age
+        )
 
-    return results
+        if oldest is None or fetched_at < oldest:
+            oldest = fetched_at
+
+    logger.info("Loaded cached forecasts for %s regions", len(_sunny_index))
+    return oldest
 
 
 async def get_cloud_cover_at_time(
     lat: float, lon: float, target_time: datetime
 ) -> Optional[int]:
-    region_id = _get_region_id(lat, lon)
+    region_id = get_region_id(lat, lon)
     target_hour = target_time.replace(minute=0, second=0, microsecond=0)
 
-    pool = await get_pool()
+    # No await between the lookup and the store below, so no lock is needed
+    target_epoch = int(_forecast_epoch(target_hour))
+    hit, cloud_cover = _cached_cloud_cover(region_id, target_epoch)
+    if hit:
+        return cloud_cover
 
-    query = """
-        SELECT cloud_cover_percent, fetched_at
-        FROM weather_cache
-        WHERE region_id = $1
-          AND forecast_time = $2
-        ORDER BY fetched_at DESC
-        LIMIT 1
-    """
+    pool = await get_pool()
 
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query, region_id, target_hour)
+            stmt = await get_prepared(conn, CLOUD_COVER_AT_TIME_QUERY)
+            row = await stmt.fetchrow(region_id, target_hour, timeout=settings.db_request_timeout)
             if row:
                 cache_valid = _is_cache_valid(row["fetched_at"])
                 if not cache_valid:
-                    logger.debug(f"Weather cache stale for {region_id} at {target_hour}, triggering background refresh")
+                    logger.debug("Weather cache stale for %s at %s, triggering background refresh", region_id, target_hour)
                     asyncio.create_task(_trigger_background_refresh(lat, lon))
+                _cache_cloud_cover(region_id, target_epoch, row["cloud_cover_percent"])
                 return row["cloud_cover_percent"]
-            logger.warning(f"No weather data found for region {region_id} at {target_hour}")
+            logger.warning("No weather data found for region %s at %s", region_id, target_hour)
+            _cache_cloud_cover(region_id, target_epoch, None)
             return None
     except Exception as e:
-        logger.error(f"Error getting cloud cover for region {region_id}: {e}")
+        logger.error("Error getting cloud cover for region %s: %s", region_id, e)
         return None
 
 
+async def load_weather_window(
+    regions: Dict[str, Tuple[float, float]], start_time: datetime, end_time: datetime
+) -> Dict[str, Dict[int, bool]]:
+    """Sunny/cloudy per forecast hour in [start_time, end_time] for several regions, in one query.
+
+    Args:
+        regions: region_id -> (lat, lon) of a point in the region, used to
+            refresh its forecast in the background when the cache is stale
+
+    Returns:
+        region_id -> {forecast epoch seconds: sunny}; hours without a forecast
+        are missing from the inner mapping.
+    """
+    window: Dict[str, Dict[int, bool]] = {region_id: {} for region_id in regions}
+    if not regions:
+        return window
+
+    pool = await get_pool()
+
+    try:
+        async with pool.acquire() as conn:
+            stmt = await get_prepared(conn, WEATHER_WINDOW_QUERY)
+            rows = await stmt.fetch(list(regions), start_time, end_time, timeout=settings.db_request_timeout)
+    except Exception as e:
+        logger.error("Error getting cloud cover range for regions %s: %s", list(regions), e)
+        return window
+
+    stale = set()
+    covers = {}
+    for row in rows:
+        region_id = row["region_id"]
+        if region_id not in stale and not _is_cache_valid(row["fetched_at"]):
+            stale.add(region_id)
+        epoch = int(_forecast_epoch(row["forecast_time"]))
+        covers[(region_id, epoch)] = row["cloud_cover_percent"]
+        window[region_id][epoch] = (
+            row["cloud_cover_percent"] < CLOUD_COVER_THRESHOLD
+        )
+    _cache_cloud_covers(covers)
+
+    for region_id in stale:
+        logger.debug("Weather cache stale for %s, triggering background refresh", region_id)
+        asyncio.create_task(_trigger_background_refresh(*regions[region_id]))
+
+    return window
+
+
+async def get_sunny_hours_between(
+    lat: float, lon: float, start_time: datetime, end_time: datetime
+) -> Dict[int, bool]:
+    """Sunny/cloudy per forecast hour in [start_time, end_time], in one query.
+
+    Returns:
+        Mapping of forecast epoch seconds to whether that hour is sunny;
+        hours without a forecast are missing from the mapping.
+    """
+    region_id = get_region_id(lat, lon)
+    window = await load_weather_window({region_id: (lat, lon)}, start_time, end_time)
+    return window[region_id]
+
+
 async def _trigger_background_refresh(lat: float, lon: float):
     """Trigger background refresh of weather data without blocking."""
     try:
         await update_weather_for_region(lat, lon)
     except Exception as e:
-        logger.error(f"Background weather refresh failed for {lat}, {lon}: {e}")
+        logger.error("Background weather refresh failed for %s, %s: %s", lat, lon, e)
 
 
 async def is_sunny_at_time(lat: float, lon: float, target_time: datetime) -> Optional[bool]:
@@ -224,30 +527,22 @@ async def get_next_sunny_time(
     from_time: datetime,
     max_hours: int = 48
 ) -> Optional[datetime]:
-    region_id = _get_region_id(lat, lon)
+    region_id = get_region_id(lat, lon)
     end_time = from_time + timedelta(hours=max_hours)
 
-    pool = await get_pool()
+    hit, next_sunny = _lookup_next_sunny(region_id, from_time, end_time)
+    if hit:
+        return next_sunny
 
-    query = """
-        SELECT forecast_time
-        FROM weather_cache
-        WHERE region_id = $1
-          AND forecast_time > $2
-          AND forecast_time < $3
-          AND cloud_cover_percent < $4
-        ORDER BY forecast_time
-        LIMIT 1
-    """
+    pool = await get_pool()
 
     try:
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(
-                query, region_id, from_time, end_time, CLOUD_COVER_THRESHOLD
-            )
+            stmt = await get_prepared(conn, NEXT_SUNNY_TIME_QUERY)
+            row = await stmt.fetchrow(region_id, from_time, end_time, timeout=settings.db_request_timeout)
             return row["forecast_time"] if row else None
     except Exception as e:
-        logger.error(f"Error finding next sunny time for region {region_id}: {e}")
+        logger.error("Error finding next sunny time for region %s: %s", region_id, e)
         return None
 
 
@@ -261,12 +556,12 @@ async def cleanup_old_forecasts(retention_hours: int = 168) -> int:
             result = await conn.fetchval(query, retention_hours)
             return result
     except Exception as e:
-        logger.error(f"Error cleaning up weather cache: {e}")
+        logger.error("Error cleaning up weather cache: %s", e)
         return 0
 
 
 async def get_weather_summary(lat: float, lon: float) -> dict:
-    region_id = _get_region_id(lat, lon)
+    region_id = get_region_id(lat, lon)
     now = datetime.now(timezone.utc)
     end = now + timedelta(hours=24)
 
@@ -296,7 +591,7 @@ async def get_weather_summary(lat: float, lon: float) -> dict:
                     "sunny_hours": row["sunny_hours"],
                 }
     except Exception as e:
-        logger.error(f"Error getting weather summary for {region_id}: {e}")
+        logger.error("Error getting weather summary for %s: %s", region_id, e)
 
     return {"region_id": region_id, "error": "Unable to fetch weather data"}
 
@@ -306,8 +601,8 @@ async def run_weather_update_once():
     logger.info("Running immediate weather update...")
     results = await update_all_region_forecasts()
     total = sum(results.values())
-    logger.info(f"Weather update complete: {total} hours across {len(results)} regions")
+    logger.info("Weather update complete: %s hours across %s regions", total, len(results))
 
     deleted = await cleanup_old_forecasts(168)
     if deleted > 0:
-        logger.info(f"Cleaned up {deleted} old forecast records")
+        logger.info("Cleaned up %s old forecast records", deleted)
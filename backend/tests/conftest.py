@@ -0,0 +1,30 @@
+"""
+Shared pytest setup for the backend tests.
+
+Puts the backend directory on sys.path once per session so the tests can
+import the `app` package however pytest is invoked, and provides a mocked
+asyncpg pool for tests that exercise the query layer.
+"""
+
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mock_conn():
+    """Connection handed out by mock_pool; tests set its fetch/prepare mocks"""
+    return MagicMock(prepared={})
+
+
+@pytest.fixture
+def mock_pool(mock_conn):
+    """asyncpg pool mock whose acquire() yields mock_conn"""
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=mock_conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    return pool
@@ -0,0 +1,379 @@
+"""
+Unit tests for the exposure service: weather gate, status caches and
+forecast-aware next-change search, with the database and weather mocked.
+
+Run with:
+    cd backend
+    source venv/bin/activate
+    pytest tests/test_exposure.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone, timedelta
+import asyncio
+
+
+async def sunny_weather_window(regions, start_time, end_time):
+    """Forecast window stub: every region is sunny in the starting hour"""
+    return {region_id: {int(start_time.timestamp()): True} for region_id in regions}
+
+
+@pytest.fixture(autouse=True)
+def clear_status_cache():
+    """Start each test with empty status caches"""
+    from app.services import exposure
+    exposure._status_cache_bucket = None
+    exposure._status_results_minute = None
+    yield
+    exposure._status_cache_bucket = None
+    exposure._status_results_minute = None
+
+
+@pytest.mark.asyncio
+async def test_exposure_returns_shady_when_cloudy():
+    """Test that exposure service returns 'shady' when weather is cloudy"""
+    from app.services.exposure import get_bench_sun_status
+
+    # Mock weather to return cloudy
+    async def mock_is_sunny():
+        return False
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny):
+        status, sun_until, remaining = await get_bench_sun_status(bench_id=1)
+
+    assert status == "shady"
+    assert sun_until is None
+    assert remaining is None
+
+
+@pytest.mark.asyncio
+async def test_exposure_skips_weather_check_when_requested():
+    """Test that skip_weather_check=True bypasses weather gate"""
+    from app.services.exposure import get_bench_sun_status
+    from app.services.exposure_matrix import ExposureMatrix
+
+    # Clear-sky exposure says sunny for the whole window
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_epoch = int(now.timestamp())
+    matrix = ExposureMatrix.from_bench_arrays([
+        {"bench_id": 1, "epochs": [start_epoch + slot * 600 for slot in range(6)], "exposed": [True] * 6}
+    ])
+
+    with patch("app.services.exposure.get_exposure_matrix", AsyncMock(return_value=matrix)), \
+            patch("app.services.exposure.check_weather_sunny", side_effect=AssertionError("weather gate")), \
+            patch("app.services.exposure.get_bench_status_single", side_effect=AssertionError("DB used")), \
+            patch("app.services.exposure.is_sunny_at_time", side_effect=AssertionError("forecast used")):
+        status, sun_until, remaining = await get_bench_sun_status(
+            bench_id=1, skip_weather_check=True
+        )
+
+    # Should return sunny based on clear-sky data, not blocked by weather
+    assert status == "sunny"
+
+
+@pytest.mark.asyncio
+async def test_exposure_queries_db_when_sunny():
+    """Test that exposure service queries DB when weather is sunny"""
+    from app.services.exposure import get_bench_sun_status
+
+    # Mock weather to return sunny
+    async def mock_is_sunny():
+        return True
+
+    # Mock DB to return bench is shaded
+    async def mock_get_status(bench_id, time):
+        return {"lat": 47.07, "lon": 15.44, "exposed": False}
+
+    async def mock_get_next_change(bench_id, lat, lon, time, is_sunny, sunny_hours=None):
+        return datetime.now(timezone.utc) + timedelta(hours=1)
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny), \
+            patch("app.services.exposure.get_bench_status_single", side_effect=mock_get_status), \
+            patch("app.services.exposure.load_weather_window", side_effect=sunny_weather_window), \
+            patch("app.services.exposure.get_next_sun_change_with_weather", side_effect=mock_get_next_change):
+        status, sun_until, remaining = await get_bench_sun_status(bench_id=1)
+
+    # Should return shady based on DB query (bench not exposed despite sunny weather)
+    assert status == "shady"
+    assert sun_until is not None
+
+
+@pytest.mark.asyncio
+async def test_batch_status_gated_when_cloudy():
+    """Test that a cloudy weather gate marks every bench in a batch shady"""
+    from app.services.exposure import get_bench_sun_status_batch
+
+    async def mock_is_sunny():
+        return False
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny), \
+            patch("app.services.exposure.get_bench_status_batch", side_effect=AssertionError("DB used")):
+        result = await get_bench_sun_status_batch([1, 2, 3])
+
+    assert result == {bench_id: ("shady", None, None) for bench_id in (1, 2, 3)}
+
+
+@pytest.mark.asyncio
+async def test_exposure_reuses_status_within_bucket():
+    """Test that repeated single-bench lookups in one bucket query the DB once"""
+    from app.services import exposure
+
+    async def mock_is_sunny():
+        return True
+
+    mock_get_status = AsyncMock(
+        return_value={"lat": 47.07, "lon": 15.44, "exposed": True}
+    )
+
+    async def mock_get_next_change(bench_id, lat, lon, time, is_sunny, sunny_hours=None):
+        return None
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny), \
+            patch("app.services.exposure.get_bench_status_single", mock_get_status), \
+            patch("app.services.exposure.load_weather_window", side_effect=sunny_weather_window), \
+            patch("app.services.exposure.get_next_sun_change_with_weather", side_effect=mock_get_next_change):
+        first = await exposure.get_bench_sun_status(bench_id=7)
+        second = await exposure.get_bench_sun_status(bench_id=7)
+
+    assert first == second == ("sunny", None, None)
+    assert mock_get_status.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_reuses_result_within_minute():
+    """Test that a repeated batch for the same benches in one minute does no work"""
+    from app.services import exposure
+
+    mock_is_sunny = AsyncMock(return_value=False)
+
+    with patch("app.services.exposure.check_weather_sunny", mock_is_sunny):
+        first = await exposure.get_bench_sun_status_batch([1, 2])
+        second = await exposure.get_bench_sun_status_batch([2, 1])
+        single = await exposure.get_bench_sun_status(bench_id=1)
+        again = await exposure.get_bench_sun_status(bench_id=1)
+
+    assert first == second
+    assert single == again == ("shady", None, None)
+    assert mock_is_sunny.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_result_hit_recomputes_countdown():
+    """Test that a cached batch result counts down from the time of each request"""
+    from app.services import exposure
+
+    minute = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    sun_until = minute + timedelta(minutes=10, seconds=30)
+    clock = iter([minute.timestamp() + 5, minute.timestamp() + 50])
+
+    async def mock_resolve(rows, time, cache):
+        for bench_id, *_ in rows:
+            cache[bench_id] = ("sunny", sun_until)
+
+    with patch("app.services.exposure.time", MagicMock(time=lambda: next(clock))), \
+            patch("app.services.exposure.check_weather_sunny", AsyncMock(return_value=True)), \
+            patch("app.services.exposure.get_bench_status_batch", AsyncMock(return_value=[
+                {"bench_id": 1, "lat": 47.07, "lon": 15.44, "exposed": True}
+            ])) as mock_get_batch, \
+            patch("app.services.exposure._resolve_sun_statuses", side_effect=mock_resolve):
+        first = await exposure.get_bench_sun_status_batch([1])
+        second = await exposure.get_bench_sun_status_batch([1])
+
+    assert first == {1: ("sunny", sun_until, 10)}
+    assert second == {1: ("sunny", sun_until, 9)}
+    assert mock_get_batch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_result_with_failed_bench_not_cached():
+    """Test that a bench left unknown by a failed lookup is retried on the next request"""
+    from app.services import exposure
+
+    failures = iter([True, False])
+
+    async def mock_resolve(rows, time, cache):
+        fail = next(failures)
+        for bench_id, *_ in rows:
+            if not (fail and bench_id == 2):
+                cache[bench_id] = ("shady", None)
+
+    async def mock_get_batch(ids, time):
+        return [{"bench_id": bench_id, "lat": 47.07, "lon": 15.44, "exposed": False} for bench_id in ids]
+
+    with patch("app.services.exposure.check_weather_sunny", AsyncMock(return_value=True)), \
+            patch("app.services.exposure.get_bench_status_batch", side_effect=mock_get_batch), \
+            patch("app.services.exposure._resolve_sun_statuses", side_effect=mock_resolve):
+        first = await exposure.get_bench_sun_status_batch([1, 2])
+        second = await exposure.get_bench_sun_status_batch([1, 2])
+
+    assert first == {1: ("shady", None, None), 2: exposure.UNKNOWN_STATUS}
+    assert second == {1: ("shady", None, None), 2: ("shady", None, None)}
+
+
+@pytest.mark.asyncio
+async def test_batch_loads_forecast_once():
+    """Test that a batch resolves every bench from one forecast window load"""
+    from app.services import exposure
+
+    bench_ids = [1, 2, 3]
+
+    async def mock_is_sunny():
+        return True
+
+    async def mock_get_batch(ids, time):
+        return [
+            {"bench_id": bench_id, "lat": 47.07, "lon": 15.44, "exposed": True}
+            for bench_id in ids
+        ]
+
+    async def mock_get_next_change(bench_id, lat, lon, time, is_sunny, sunny_hours=None):
+        assert sunny_hours is not None
+        return None
+
+    mock_window = AsyncMock(side_effect=sunny_weather_window)
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny), \
+            patch("app.services.exposure.get_bench_status_batch", side_effect=mock_get_batch), \
+            patch("app.services.exposure.load_weather_window", mock_window), \
+            patch("app.services.exposure.get_next_sun_change_with_weather", side_effect=mock_get_next_change):
+        result = await exposure.get_bench_sun_status_batch(bench_ids)
+
+    assert result == {bench_id: ("sunny", None, None) for bench_id in bench_ids}
+    assert mock_window.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_nearby_statuses_unknown_when_forecast_fails():
+    """Test that a failing forecast load degrades nearby benches to unknown"""
+    from app.services import exposure
+
+    benches = [{"id": 1, "lat": 47.07, "lon": 15.44, "exposed": True}]
+
+    with patch("app.services.exposure.check_weather_sunny", AsyncMock(return_value=True)), \
+            patch("app.services.exposure.get_benches_with_status", AsyncMock(return_value=benches)), \
+            patch("app.services.exposure.load_weather_window", AsyncMock(side_effect=TimeoutError)):
+        rows, status_map = await exposure.get_benches_with_sun_status(47.07, 15.44, 1000)
+
+    assert rows == benches
+    assert status_map == {1: exposure.UNKNOWN_STATUS}
+
+
+@pytest.mark.asyncio
+async def test_next_change_reads_forecast_window_once():
+    """Test that the next-change scan loads the forecast window in one query"""
+    from app.services.exposure import get_next_sun_change_with_weather
+    from app.services.exposure_matrix import ExposureMatrix
+
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_epoch = int(now.timestamp())
+    matrix = ExposureMatrix.from_bench_arrays([
+        {"bench_id": 1, "epochs": [start_epoch + slot * 600 for slot in range(50 * 6)], "exposed": [True] * (50 * 6)}
+    ])
+    # Cloudy for the next three hours, sunny after that
+    sunny_hours = {start_epoch + h * 3600: h > 3 for h in range(50)}
+    mock_range = AsyncMock(return_value=sunny_hours)
+
+    with patch("app.services.exposure.get_exposure_matrix", AsyncMock(return_value=matrix)), \
+            patch("app.services.exposure.get_sunny_hours_between", mock_range), \
+            patch("app.services.exposure.is_sunny_at_time", side_effect=AssertionError("per-hour lookup")):
+        result = await get_next_sun_change_with_weather(1, 47.07, 15.44, now, False)
+
+    assert result == now + timedelta(hours=4)
+    mock_range.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_prefetches_weather_once_per_call():
+    """Test that a batch loads its regions' forecast once and shares it"""
+    from app.services import exposure
+    from app.services.exposure_matrix import ExposureMatrix
+
+    hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_epoch = int(hour.timestamp()) - 3600
+    matrix = ExposureMatrix.from_bench_arrays([
+        {"bench_id": bench_id, "epochs": [start_epoch + slot * 600 for slot in range(52 * 6)], "exposed": [True] * (52 * 6)}
+        for bench_id in (1, 2, 3)
+    ])
+    sunny_hours = {start_epoch + h * 3600: True for h in range(52)}
+    mock_window = AsyncMock(return_value={"graz_235_77": sunny_hours})
+
+    async def mock_is_sunny():
+        return True
+
+    async def mock_get_batch(ids, time):
+        return [
+            {"bench_id": bench_id, "lat": 47.07, "lon": 15.44, "exposed": True}
+            for bench_id in ids
+        ]
+
+    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny), \
+            patch("app.services.exposure.get_bench_status_batch", side_effect=mock_get_batch), \
+            patch("app.services.exposure.get_exposure_matrix", AsyncMock(return_value=matrix)), \
+            patch("app.services.exposure.load_weather_window", mock_window), \
+            patch("app.services.exposure.is_sunny_at_time", side_effect=AssertionError("per-hour lookup")), \
+            patch("app.services.exposure.get_sunny_hours_between", side_effect=AssertionError("per-bench load")):
+        result = await exposure.get_bench_sun_status_batch([1, 2, 3])
+
+    assert [status for status, _, _ in result.values()] == ["sunny"] * 3
+    mock_window.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_next_change_falls_back_to_hours_without_forecast():
+    """Test that shady hours with no forecast are used when no sunny hour is found"""
+    from app.services.exposure import get_next_sun_change_with_weather
+    from app.services.exposure_matrix import ExposureMatrix
+
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start_epoch = int(now.timestamp())
+    # Clear sky for the first 5 hours, shaded afterwards; always cloudy
+    # except for a gap in the forecast at hour 8
+    matrix = ExposureMatrix.from_bench_arrays([
+        {"bench_id": 1, "epochs": [start_epoch + slot * 600 for slot in range(50 * 6)],
+         "exposed": [slot < 5 * 6 for slot in range(50 * 6)]}
+    ])
+    sunny_hours = {start_epoch + h * 3600: False for h in range(50) if h != 8}
+
+    with patch("app.services.exposure.get_exposure_matrix", AsyncMock(return_value=matrix)), \
+            patch("app.services.exposure.get_sunny_hours_between", AsyncMock(return_value=sunny_hours)):
+        from_shade = await get_next_sun_change_with_weather(1, 47.07, 15.44, now, False)
+        from_sun = await get_next_sun_change_with_weather(1, 47.07, 15.44, now, True)
+
+    assert from_shade == now + timedelta(hours=8)
+    assert from_sun == now + timedelta(hours=1)
+
+
+
+def test_remaining_minutes_never_negative():
+    """Test that a change already past counts as zero minutes away"""
+    from app.services.exposure import _with_remaining_minutes
+
+    now = datetime(2026, 6, 1, 12, 0, 30, tzinfo=timezone.utc)
+
+    assert _with_remaining_minutes("sunny", now - timedelta(seconds=20), now.timestamp())[2] == 0
+    assert _with_remaining_minutes("sunny", now + timedelta(minutes=5), now.timestamp())[2] == 5
+    assert _with_remaining_minutes("shady", None, now.timestamp()) == ("shady", None, None)
+
+# =============================================================================
+# Test: Data Window
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_data_window_concurrent_misses_share_one_query(mock_conn, mock_pool):
+    """Test that concurrent data window misses run a single query"""
+    from app.db import queries
+
+    window = {
+        "start_ts": datetime(2026, 1, 12, tzinfo=timezone.utc),
+        "end_ts": datetime(2026, 1, 19, tzinfo=timezone.utc),
+    }
+    mock_conn.fetchrow = AsyncMock(return_value=window)
+
+    queries._data_window_cache = (float("-inf"), (None, None))
+    with patch("app.db.queries.get_pool", AsyncMock(return_value=mock_pool)):
+        results = await asyncio.gather(*(queries.get_data_window() for _ in range(5)))
+
+    assert results == [(window["start_ts"], window["end_ts"])] * 5
+    assert mock_conn.fetchrow.await_count == 1
+    queries._data_window_cache = (float("-inf"), (None, None))
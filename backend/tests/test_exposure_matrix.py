@@ -0,0 +1,165 @@
+"""
+Unit tests for the in-memory exposure matrix.
+
+Run with:
+    cd backend
+    source venv/bin/activate
+    pytest tests/test_exposure_matrix.py -v
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from app.services.exposure_matrix import ExposureMatrix, UNKNOWN
+
+START = datetime(2026, 1, 12, 8, 0, tzinfo=timezone.utc)
+START_EPOCH = int(START.timestamp())
+
+
+def make_bench_arrays(series: dict[int, list]):
+    """Build per-bench (bench_id, epochs, exposed) rows as get_exposure_since
+    returns them; None entries are left out"""
+    rows = []
+    for bench_id, values in series.items():
+        slots = [slot for slot, exposed in enumerate(values) if exposed is not None]
+        rows.append({
+            "bench_id": bench_id,
+            "epochs": [START_EPOCH + slot * 600 for slot in slots],
+            "exposed": [values[slot] for slot in slots],
+        })
+    return rows
+
+
+def test_from_bench_arrays_fills_unknown_cells():
+    """Test that missing slots are stored as unknown"""
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays({1: [True, None, False], 2: [False]}))
+
+    assert matrix.exposure.shape == (2, 3)
+    assert matrix.exposure[matrix.index[1]].tolist() == [1, UNKNOWN, 0]
+    assert matrix.exposure[matrix.index[2]].tolist() == [0, UNKNOWN, UNKNOWN]
+
+
+def test_status_finds_next_change():
+    """Test current exposure and next change for several benches"""
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays({
+        1: [True, True, False, False],
+        2: [False, False, False, False],
+        3: [False, None, True, True],
+    }))
+
+    status = matrix.status([1, 2, 3], START)
+
+    assert status[1] == (True, START + timedelta(minutes=20))
+    assert status[2] == (False, None)
+    # Unknown slots are not treated as a change
+    assert status[3] == (False, START + timedelta(minutes=20))
+
+
+def test_status_unknown_bench_and_time():
+    """Test that benches or times outside the matrix have no status"""
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays({1: [True, False]}))
+
+    assert matrix.status([99], START) == {99: (None, None)}
+    assert matrix.status([1], START + timedelta(days=1)) == {1: (None, None)}
+
+
+def test_hourly_samples_every_sixth_slot():
+    """Test hourly sampling including hours past the end of the data"""
+    values = [True] * 6 + [False] * 6
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays({1: values}))
+
+    hourly = matrix.hourly(1, START, 3)
+
+    assert hourly.tolist() == [1, 0, UNKNOWN]
+
+
+def test_empty_matrix():
+    """Test that an empty result set yields an empty matrix"""
+    matrix = ExposureMatrix.from_bench_arrays([])
+
+    assert matrix.status([1], START) == {1: (None, None)}
+    assert matrix.hourly(1, START, 2).tolist() == [UNKNOWN, UNKNOWN]
+
+
+def test_next_transition_across_lanes():
+    """Test transitions that lie beyond the first 64-slot lane"""
+    values = [True] * 130 + [False] * 20
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays({1: values}))
+
+    assert matrix.next_transition_slot(1, 0) == 130
+    assert matrix.next_transition_slot(1, 129) == 130
+    assert matrix.next_transition_slot(1, 130) is None
+    assert matrix.next_transition_slot(1, 200) is None
+
+
+def test_packed_scan_matches_naive_scan():
+    """Test the bit-packed scan against a plain per-slot loop"""
+    import random
+
+    rng = random.Random(42)
+    series = {
+        bench_id: [rng.choice([True, False, None]) for _ in range(200)]
+        for bench_id in range(1, 11)
+    }
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays(series))
+
+    for bench_id, values in series.items():
+        for slot in (0, 1, 63, 64, 65, 127, 150, 199):
+            current = values[slot]
+            expected = None
+            if current is not None:
+                expected = next(
+                    (t for t in range(slot + 1, len(values))
+                     if values[t] is not None and values[t] != current),
+                    None,
+                )
+            assert matrix.next_transition_slot(bench_id, slot) == expected
+
+
+def test_scan_kernel_matches_packed_scan():
+    """Test the scan kernel (JIT or plain Python) against the packed scan"""
+    import random
+    import numpy as np
+    from app.services.exposure_kernels import scan_status_arrays
+
+    rng = random.Random(7)
+    series = {
+        bench_id: [rng.choice([True, False, None]) for _ in range(150)]
+        for bench_id in range(1, 6)
+    }
+    matrix = ExposureMatrix.from_bench_arrays(make_bench_arrays(series))
+    rows = np.array(sorted(matrix.index.values()), dtype=np.int64)
+
+    for slot in (0, 64, 149):
+        status, until = scan_status_arrays(matrix.exposure, rows, slot)
+        current = matrix.exposure[rows, slot]
+        expected = matrix.next_transition_slots(rows, slot, current == 1)
+        for i in range(len(rows)):
+            assert status[i] == current[i]
+            if current[i] != UNKNOWN:
+                assert until[i] == expected[i]
+
+
+async def test_matrix_reloads_only_when_data_window_moves():
+    """Test that the matrix is reused until new precomputed data arrives"""
+    from unittest.mock import AsyncMock, patch
+    from app.services import exposure_matrix
+
+    exposure_matrix._matrix = None
+    window = {"end": START + timedelta(days=7)}
+
+    async def mock_window():
+        return START, window["end"]
+
+    load = AsyncMock(return_value=make_bench_arrays({1: [True, False]}))
+
+    with patch("app.services.exposure_matrix.get_data_window", side_effect=mock_window), \
+            patch("app.services.exposure_matrix.get_exposure_since", load):
+        first = await exposure_matrix.get_exposure_matrix()
+        again = await exposure_matrix.get_exposure_matrix()
+        window["end"] += timedelta(days=7)
+        reloaded = await exposure_matrix.get_exposure_matrix()
+
+    assert first is again
+    assert reloaded is not first
+    assert load.await_count == 2
+    exposure_matrix._matrix = None
@@ -0,0 +1,39 @@
+"""
+Guard against the same route being registered more than once.
+
+Run with:
+    cd backend
+    source venv/bin/activate
+    pytest tests/test_routes.py -v
+"""
+
+from collections import Counter
+
+
+def test_each_method_and_path_is_registered_once():
+    """Test that no two routes share an HTTP method and path"""
+    from fastapi.routing import APIRoute
+    from app.main import app
+
+    registered = Counter(
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    )
+    duplicates = [key for key, count in registered.items() if count > 1]
+
+    assert duplicates == []
+
+
+def test_if_none_match_accepts_lists_and_weak_tags():
+    """Test that If-None-Match lists, weak tags and * match the bench ETag"""
+    from app.api.benches import _etag_matches
+
+    etag = 'W/"123-1-abc"'
+
+    assert _etag_matches('"other", W/"123-1-abc"', etag)
+    assert _etag_matches('"123-1-abc"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('W/"123-0-abc"', etag)
+    assert not _etag_matches(None, etag)
@@ -71,8 +71,7 @@ async def test_weather_service():
 
     # Test 4: Helper functions
     print("\n[Test 4] Testing helper functions...")
-    sunny = await is_sunny()
-    seconds = await get_sunshine_seconds()
+    sunny, seconds = await asyncio.gather(is_sunny(), get_sunshine_seconds())
     print(f"  is_sunny(): {sunny}")
     print(f"  get_sunshine_seconds(): {seconds}")
     print("  ✓ Helper functions working")
@@ -96,30 +95,35 @@ async def test_exposure_integration():
     sunny = await is_sunny()
     print(f"\nCurrent weather: {'Sunny' if sunny else 'Cloudy/Overcast'}")
 
+    # Both lookups are independent, so run them together
+    gated, clear_sky = await asyncio.gather(
+        get_bench_sun_status(bench_id=1),
+        get_bench_sun_status(bench_id=1, skip_weather_check=True),
+        return_exceptions=True,
+    )
+
     # Test with weather gate
     print("\n[Test 1] Getting bench status WITH weather gate...")
     print("  (Note: This will fail if database is not running - that's OK)")
-    try:
-        status, sun_until, remaining = await get_bench_sun_status(bench_id=1)
+    if isinstance(gated, Exception):
+        print(f"  ⚠ Database not available (expected): {type(gated).__name__}")
+        print("  This is OK - weather gate logic was still tested")
+    else:
+        status, sun_until, remaining = gated
         print(f"  Status: {status}")
         print(f"  Sun until: {sun_until}")
         print(f"  Remaining minutes: {remaining}")
 
         if not sunny and status == "shady":
             print("  ✓ Weather gate working: cloudy weather = shady bench")
-    except Exception as e:
-        print(f"  ⚠ Database not available (expected): {type(e).__name__}")
-        print("  This is OK - weather gate logic was still tested")
 
     # Test with weather gate skipped
     print("\n[Test 2] Getting bench status WITHOUT weather gate...")
-    try:
-        status, sun_until, remaining = await get_bench_sun_status(
-            bench_id=1, skip_weather_check=True
-        )
+    if isinstance(clear_sky, Exception):
+        print(f"  ⚠ Database not available: {type(clear_sky).__name__}")
+    else:
+        status, sun_until, remaining = clear_sky
         print(f"  Status: {status}")
-    except Exception as e:
-        print(f"  ⚠ Database not available: {type(e).__name__}")
 
     print("\n" + "=" * 60)
     print("Exposure integration tests completed!")
@@ -127,19 +131,25 @@ async def test_exposure_integration():
 
 
 async def main():
+    from app.services.http import close_http_session
+
     print(f"\nTest started at: {datetime.now()}")
     print(f"Testing GeoSphere Weather API Integration (LIVE)\n")
 
-    # Test weather service
-    success = await test_weather_service()
-    if not success:
-        print("\n⚠ Weather service tests failed!")
-        return
-
-    # Test exposure integration
-    await test_exposure_integration()
-
-    print("\n✓ All tests completed!")
+    # All API calls below reuse the app's shared HTTP session
+    try:
+        # Test weather service
+        success = await test_weather_service()
+        if not success:
+            print("\n⚠ Weather service tests failed!")
+            return
+
+        # Test exposure integration
+        await test_exposure_integration()
+
+        print("\n✓ All tests completed!")
+    finally:
+        await close_http_session()
 
 
 if __name__ == "__main__":
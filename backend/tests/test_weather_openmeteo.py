@@ -0,0 +1,235 @@
+"""
+Unit tests for the Open-Meteo forecast service with mocked API responses
+and database.
+
+Run with:
+    cd backend
+    source venv/bin/activate
+    pytest tests/test_weather_openmeteo.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from datetime import datetime, timezone, timedelta
+import asyncio
+
+
+def create_openmeteo_response(start: datetime, cloud_cover: list):
+    """Create a mock Open-Meteo hourly response (unixtime format)"""
+    start_epoch = int(start.timestamp())
+    return {
+        "hourly": {
+            "time": [start_epoch + h * 3600 for h in range(len(cloud_cover))],
+            "cloudcover": cloud_cover,
+            "sunshine_duration": [0.0] * len(cloud_cover),
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_parse_forecast_fills_missing_values():
+    """Test that null and missing hourly values are parsed as NaN"""
+    import numpy as np
+    from app.services.weather_openmeteo import _parse_forecast
+
+    start = datetime(2026, 6, 1, 0, tzinfo=timezone.utc)
+    data = create_openmeteo_response(start, [90, None, 10])
+    data["hourly"]["sunshine_duration"] = [0.0, 1800.0]
+
+    forecast = await _parse_forecast(data)
+
+    assert forecast["time"].tolist() == [int(start.timestamp()) + h * 3600 for h in range(3)]
+    assert forecast["cloud_cover"][[0, 2]].tolist() == [90.0, 10.0]
+    assert np.isnan(forecast["cloud_cover"][1])
+    assert forecast["sunshine"][:2].tolist() == [0.0, 1800.0]
+    assert np.isnan(forecast["sunshine"][2])
+    assert await _parse_forecast({"hourly": {"time": []}}) is None
+
+
+@pytest.mark.asyncio
+async def test_next_sunny_served_from_index():
+    """Test that next-sunny lookups use the indexed forecast without the DB"""
+    from app.services import weather_openmeteo
+
+    start = datetime(2026, 6, 1, 0, tzinfo=timezone.utc)
+    forecast = await weather_openmeteo._parse_forecast(
+        create_openmeteo_response(start, [90, 80, 10, 95, 5] + [70] * 20)
+    )
+    weather_openmeteo._sunny_index.clear()
+    weather_openmeteo._index_sunny_hours("graz_235_77", forecast)
+
+    with patch("app.services.weather_openmeteo.get_pool", side_effect=AssertionError("DB used")):
+        first = await weather_openmeteo.get_next_sunny_time(47.05, 15.45, start, max_hours=12)
+        second = await weather_openmeteo.get_next_sunny_time(
+            47.05, 15.45, start + timedelta(hours=2), max_hours=12
+        )
+        none_found = await weather_openmeteo.get_next_sunny_time(
+            47.05, 15.45, start + timedelta(hours=4), max_hours=12
+        )
+
+    assert first == start + timedelta(hours=2)
+    assert second == start + timedelta(hours=4)
+    assert none_found is None
+    weather_openmeteo._sunny_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_next_sunny_falls_back_outside_index(mock_conn, mock_pool):
+    """Test that windows beyond the indexed forecast go to the DB"""
+    from app.services import weather_openmeteo
+
+    start = datetime(2026, 6, 1, 0, tzinfo=timezone.utc)
+    forecast = await weather_openmeteo._parse_forecast(create_openmeteo_response(start, [90] * 6))
+    weather_openmeteo._sunny_index.clear()
+    weather_openmeteo._index_sunny_hours("graz_235_77", forecast)
+
+    expected = start + timedelta(hours=20)
+    mock_stmt = MagicMock()
+    mock_stmt.fetchrow = AsyncMock(return_value={"forecast_time": expected})
+    mock_conn.prepare = AsyncMock(return_value=mock_stmt)
+
+    with patch("app.services.weather_openmeteo.get_pool", AsyncMock(return_value=mock_pool)):
+        result = await weather_openmeteo.get_next_sunny_time(47.05, 15.45, start, max_hours=48)
+
+    assert result == expected
+    mock_stmt.fetchrow.assert_awaited_once()
+    weather_openmeteo._sunny_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_stored_forecasts_hydrate_caches(mock_conn, mock_pool):
+    """Test that forecasts persisted in weather_cache are served from memory after a restart"""
+    from app.services import weather_openmeteo
+
+    weather_openmeteo._sunny_index.clear()
+    weather_openmeteo._forecast_cache.clear()
+    hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    fetched_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    rows = [
+        {"region_id": "graz_235_77", "epoch": int(hour.timestamp()) + h * 3600,
+         "cloud_cover_percent": cover, "fetched_at": fetched_at}
+        for h, cover in enumerate([90, None, 10] + [80] * 10)
+    ]
+    mock_conn.fetch = AsyncMock(return_value=rows)
+
+    with patch("app.services.weather_openmeteo.get_pool", AsyncMock(return_value=mock_pool)):
+        oldest = await weather_openmeteo.load_cached_forecasts()
+
+    with patch("app.services.weather_openmeteo.get_pool", side_effect=AssertionError("DB used")):
+        next_sunny = await weather_openmeteo.get_next_sunny_time(47.05, 15.45, hour, max_hours=6)
+        cloud_cover = await weather_openmeteo.get_cloud_cover_at_time(47.05, 15.45, hour)
+
+    assert oldest == fetched_at
+    assert next_sunny == hour + timedelta(hours=2)
+    assert cloud_cover == 90
+    weather_openmeteo._sunny_index.clear()
+    weather_openmeteo._forecast_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_region_updates_share_one_fetch():
+    """Test that concurrent updates of one region trigger a single Open-Meteo request"""
+    from app.services import weather_openmeteo
+
+    calls = 0
+
+    async def mock_fetch(lat, lon):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return None
+
+    with patch("app.services.weather_openmeteo._fetch_openmeteo_forecast", side_effect=mock_fetch):
+        results = await asyncio.gather(
+            weather_openmeteo.update_weather_for_region(47.05, 15.45),
+            weather_openmeteo.update_weather_for_region(47.07, 15.44),
+            weather_openmeteo.update_weather_for_region(47.06, 15.41),
+        )
+
+    assert calls == 1
+    assert results == [(0, False)] * 3
+    assert weather_openmeteo._region_updates == {}
+
+
+@pytest.mark.asyncio
+async def test_cloud_cover_cached_per_region_hour(mock_conn, mock_pool):
+    """Test that benches sharing a region and hour query weather_cache once"""
+    from app.services import weather_openmeteo
+
+    weather_openmeteo._forecast_cache.clear()
+    target = datetime(2026, 6, 1, 12, 20, tzinfo=timezone.utc)
+    mock_stmt = MagicMock()
+    mock_stmt.fetchrow = AsyncMock(
+        return_value={"cloud_cover_percent": 10, "fetched_at": datetime.now(timezone.utc)}
+    )
+    mock_conn.prepare = AsyncMock(return_value=mock_stmt)
+
+    with patch("app.services.weather_openmeteo.get_pool", AsyncMock(return_value=mock_pool)):
+        first = await weather_openmeteo.is_sunny_at_time(47.05, 15.45, target)
+        second = await weather_openmeteo.is_sunny_at_time(47.06, 15.41, target + timedelta(minutes=30))
+
+    assert first is second is True
+    mock_stmt.fetchrow.assert_awaited_once()
+    weather_openmeteo._forecast_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_weather_window_reads_regions_in_one_query(mock_conn, mock_pool):
+    """Test that a forecast window for several regions comes from one fetch"""
+    from app.services import weather_openmeteo
+
+    weather_openmeteo._forecast_cache.clear()
+    start = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+    fetched_at = datetime.now(timezone.utc)
+    mock_stmt = MagicMock()
+    mock_stmt.fetch = AsyncMock(return_value=[
+        {"region_id": "graz_235_77", "forecast_time": start,
+         "cloud_cover_percent": 10, "fetched_at": fetched_at},
+        {"region_id": "graz_235_77", "forecast_time": start + timedelta(hours=1),
+         "cloud_cover_percent": 90, "fetched_at": fetched_at},
+    ])
+    mock_conn.prepare = AsyncMock(return_value=mock_stmt)
+    regions = {"graz_235_77": (47.07, 15.44), "graz_236_77": (47.2, 15.44)}
+
+    with patch("app.services.weather_openmeteo.get_pool", AsyncMock(return_value=mock_pool)):
+        window = await weather_openmeteo.load_weather_window(
+            regions, start, start + timedelta(hours=2)
+        )
+
+    start_epoch = int(start.timestamp())
+    assert window == {
+        "graz_235_77": {start_epoch: True, start_epoch + 3600: False},
+        "graz_236_77": {},
+    }
+    mock_stmt.fetch.assert_awaited_once()
+    weather_openmeteo._forecast_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_region_updates_run_concurrently(mock_conn, mock_pool):
+    """Test that bulk region updates overlap instead of running one by one"""
+    from app.services import weather_openmeteo
+
+    regions = [
+        {"region_id": f"graz_470_15{i}", "lat": 47.0, "lon": 15.0 + i / 10}
+        for i in range(3)
+    ]
+    mock_conn.fetch = AsyncMock(return_value=regions)
+
+    started = []
+    all_started = asyncio.Event()
+
+    async def mock_update(lat, lon):
+        # Only returns once every region has started, so a sequential loop would hang
+        started.append(lon)
+        if len(started) == len(regions):
+            all_started.set()
+        await all_started.wait()
+        return 24, True
+
+    with patch("app.services.weather_openmeteo.get_pool", AsyncMock(return_value=mock_pool)), \
+            patch("app.services.weather_openmeteo.update_weather_for_region", side_effect=mock_update), \
+            patch("app.services.weather_openmeteo.OPENMETEO_MIN_REQUEST_INTERVAL", 0):
+        results = await asyncio.wait_for(weather_openmeteo.update_all_region_forecasts(), timeout=1)
+
+    assert results == {region["region_id"]: 24 for region in regions}
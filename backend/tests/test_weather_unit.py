@@ -10,17 +10,47 @@ Run with:
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime, timezone, timedelta
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from types import MappingProxyType
 from aiohttp import ClientResponseError, ClientTimeout
 import asyncio
-
-import sys
-sys.path.insert(0, ".")
-
-
-# Sample API responses for mocking
+import orjson
+import time
+
+from app.services import weather
+from app.services.weather import (
+    STATION_NAMES,
+    _create_status_message,
+    _is_cache_valid,
+    fetch_weather_from_api,
+    get_current_weather,
+    get_sunshine_seconds,
+    is_sunny,
+)
+
+
+def _freeze(value):
+    """Read-only copy of a JSON-like value (dicts -> mapping proxies, lists -> tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """orjson fallback for frozen responses"""
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError
+
+
+# Sample API responses for mocking; frozen so tests can share them
+@lru_cache(maxsize=16)
 def create_geosphere_response(sunshine_seconds: int, timestamp: str = "2026-01-12T12:00:00+00:00"):
     """Create a mock GeoSphere API response"""
-    return {
+    return _freeze({
         "type": "FeatureCollection",
         "timestamps": [timestamp],
         "features": [{
@@ -40,7 +70,7 @@ def create_geosphere_response(sunshine_seconds: int, timestamp: str = "2026-01-1
                 }
             }
         }]
-    }
+    })
 
 
 SUNNY_RESPONSE = create_geosphere_response(600)  # 10 minutes of sun (full sun)
@@ -50,9 +80,18 @@ PARTIAL_SUN_RESPONSE = create_geosphere_response(180)  # 3 minutes of sun
 
 def reset_weather_cache():
     """Reset the weather service cache between tests"""
-    from app.services import weather
+    from app.services import http
     weather._weather_cache = None
     weather._cache_time = None
+    weather._inflight = None
+    http._session = None
+
+
+def age_weather_cache(seconds: float, status=None):
+    """Make the cached weather reading `seconds` old, optionally replacing it first"""
+    if status is not None:
+        weather._weather_cache = status
+    weather._cache_time = time.monotonic() - seconds
 
 
 @pytest.fixture(autouse=True)
@@ -72,23 +111,23 @@ class MockResponse:
     async def json(self):
         return self._json_data
 
+    async def read(self):
+        return orjson.dumps(self._json_data, default=_thaw)
+
     async def text(self):
         return str(self._json_data)
 
-    async def __aenter__(self):
-        return self
-
-    async def __aexit__(self, *args):
-        pass
-
 
 class MockClientSession:
-    """Mock aiohttp ClientSession"""
+    """Mock aiohttp ClientSession; each get() opens its own request context"""
+    closed = False
+
     def __init__(self, response):
         self._response = response
 
-    def get(self, url, params=None, timeout=None):
-        return self._response
+    @asynccontextmanager
+    async def get(self, url, params=None, timeout=None):
+        yield self._response
 
     async def __aenter__(self):
         return self
@@ -97,60 +136,36 @@ class MockClientSession:
         pass
 
 
-# =============================================================================
-# Test: Sunny Detection (SO > 0)
-# =============================================================================
-
-@pytest.mark.asyncio
-async def test_sunny_detection_full_sun():
-    """Test that SO > 0 is detected as sunny"""
-    from app.services.weather import fetch_weather_from_api
-
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        status = await fetch_weather_from_api()
-
-    assert status.is_sunny is True
-    assert status.sunshine_seconds == 600
-    assert "Sunny conditions" in status.message
-
+# Responses and sessions are stateless, so one instance per payload serves every test
+@pytest.fixture(scope="module")
+def sunny_session():
+    return MockClientSession(MockResponse(SUNNY_RESPONSE))
 
-@pytest.mark.asyncio
-async def test_sunny_detection_partial_sun():
-    """Test that partial sunshine (SO > 0 but < 600) is detected as sunny"""
-    from app.services.weather import fetch_weather_from_api
 
-    mock_response = MockResponse(PARTIAL_SUN_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        status = await fetch_weather_from_api()
-
-    assert status.is_sunny is True
-    assert status.sunshine_seconds == 180
-    assert "Partial sunshine" in status.message
+@pytest.fixture(scope="module")
+def cloudy_session():
+    return MockClientSession(MockResponse(CLOUDY_RESPONSE))
 
 
 # =============================================================================
-# Test: Cloudy Detection (SO = 0)
+# Test: Sunny (SO > 0) / Cloudy (SO = 0) Detection
 # =============================================================================
 
+@pytest.mark.parametrize("sunshine_seconds,expected_sunny,expected_message", [
+    (600, True, "Sunny conditions"),   # full sun
+    (180, True, "Partial sunshine"),   # SO > 0 but < 600 is still sunny
+    (0, False, "Overcast"),            # no sun
+])
 @pytest.mark.asyncio
-async def test_cloudy_detection():
-    """Test that SO = 0 is detected as cloudy"""
-    from app.services.weather import fetch_weather_from_api
+async def test_sunshine_detection(sunshine_seconds, expected_sunny, expected_message):
+    """Test that SO > 0 is detected as sunny and SO = 0 as cloudy"""
+    session = MockClientSession(MockResponse(create_geosphere_response(sunshine_seconds)))
 
-    mock_response = MockResponse(CLOUDY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        status = await fetch_weather_from_api()
+    status = await fetch_weather_from_api(session=session)
 
-    assert status.is_sunny is False
-    assert status.sunshine_seconds == 0
-    assert "Overcast" in status.message or "cloudy" in status.message
+    assert status.is_sunny is expected_sunny
+    assert status.sunshine_seconds == sunshine_seconds
+    assert expected_message in status.message
 
 
 # =============================================================================
@@ -158,14 +173,10 @@ async def test_cloudy_detection():
 # =============================================================================
 
 @pytest.mark.asyncio
-async def test_cache_miss_on_first_call():
+async def test_cache_miss_on_first_call(sunny_session):
     """Test that first call is a cache miss"""
-    from app.services.weather import get_current_weather
 
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         status, cache_hit = await get_current_weather()
 
     assert cache_hit is False
@@ -173,14 +184,10 @@ async def test_cache_miss_on_first_call():
 
 
 @pytest.mark.asyncio
-async def test_cache_hit_on_second_call():
+async def test_cache_hit_on_second_call(sunny_session):
     """Test that second call within TTL is a cache hit"""
-    from app.services.weather import get_current_weather
-
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         # First call - should miss cache
         status1, cache_hit1 = await get_current_weather()
         assert cache_hit1 is False
@@ -195,14 +202,10 @@ async def test_cache_hit_on_second_call():
 
 
 @pytest.mark.asyncio
-async def test_force_refresh_bypasses_cache():
+async def test_force_refresh_bypasses_cache(sunny_session):
     """Test that force_refresh=True bypasses the cache"""
-    from app.services.weather import get_current_weather
 
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         # First call - populate cache
         await get_current_weather()
 
@@ -212,25 +215,61 @@ async def test_force_refresh_bypasses_cache():
     assert cache_hit is False
 
 
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    """Test that concurrent cache misses trigger a single API fetch"""
+    from app.models.weather import WeatherStatus
+
+    calls = 0
+
+    async def mock_fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return WeatherStatus(
+            is_sunny=True,
+            sunshine_seconds=600,
+            station_id="11290",
+            station_name="Graz Universitaet",
+            timestamp=datetime.now(timezone.utc),
+            message="Sunny"
+        )
+
+    with patch("app.services.weather.fetch_weather_from_api", side_effect=mock_fetch):
+        results = await asyncio.gather(*(get_current_weather() for _ in range(5)))
+
+    assert calls == 1
+    assert all(cache_hit is False for _, cache_hit in results)
+    assert all(status.is_sunny for status, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_make_one_http_request(sunny_session):
+    """Test that 20 concurrent sunshine checks send a single GeoSphere request"""
+
+    with patch("aiohttp.ClientSession", return_value=sunny_session), \
+            patch.object(sunny_session, "get", wraps=sunny_session.get) as session_get:
+        results = await asyncio.gather(*(is_sunny() for _ in range(20)))
+
+    assert all(results)
+    session_get.assert_called_once()
+
+
 # =============================================================================
 # Test: Cache Expiration After TTL
 # =============================================================================
 
 @pytest.mark.asyncio
-async def test_cache_expires_after_ttl():
+async def test_cache_expires_after_ttl(sunny_session):
     """Test that cache expires after TTL"""
-    from app.services import weather
-    from app.services.weather import get_current_weather
-
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
+    from app.config import settings
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         # First call - populate cache
         await get_current_weather()
 
-        # Manually set cache time to be expired (TTL + 1 second ago)
-        weather._cache_time = datetime.now(timezone.utc) - timedelta(seconds=601)
+        # Manually set cache time to be expired past the grace window
+        age_weather_cache(settings.weather_cache_ttl + settings.weather_cache_grace + 1)
 
         # This call should miss cache due to expiration
         status, cache_hit = await get_current_weather()
@@ -239,24 +278,63 @@ async def test_cache_expires_after_ttl():
 
 
 @pytest.mark.asyncio
-async def test_cache_valid_within_ttl():
+async def test_cache_valid_within_ttl(sunny_session):
     """Test that cache is valid within TTL window"""
-    from app.services import weather
-    from app.services.weather import get_current_weather, _is_cache_valid
 
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         # Populate cache
         await get_current_weather()
 
         # Set cache time to 5 minutes ago (within default 10min TTL)
-        weather._cache_time = datetime.now(timezone.utc) - timedelta(seconds=300)
+        age_weather_cache(300)
 
         assert _is_cache_valid() is True
 
 
+@pytest.mark.asyncio
+async def test_stale_cache_served_while_refreshing(sunny_session):
+    """Test that a reading just past its TTL is returned at once and refreshed in the background"""
+    from app.config import settings
+    from app.models.weather import WeatherStatus
+
+    stale_status = WeatherStatus(
+        is_sunny=False,
+        sunshine_seconds=0,
+        station_id=settings.geosphere_station_id,
+        station_name="Graz Universitaet",
+        timestamp=datetime.now(timezone.utc) - timedelta(minutes=11),
+        cached_at=datetime.now(timezone.utc) - timedelta(minutes=11),
+        message="Stale cloudy data"
+    )
+    age_weather_cache(settings.weather_cache_ttl + 1, stale_status)
+
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
+        status, cache_hit = await get_current_weather()
+        assert cache_hit is True
+        assert status is stale_status
+
+        # The refresh runs in the background; once done the fresh reading is cached
+        await weather._inflight
+        status, cache_hit = await get_current_weather()
+
+    assert cache_hit is True
+    assert status.is_sunny is True
+
+
+@pytest.mark.asyncio
+async def test_cache_not_shared_across_stations(sunny_session):
+    """Test that a cached reading is not served for a different station"""
+    from app.config import settings
+
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
+        await get_current_weather()
+        with patch.object(settings, "geosphere_station_id", "99999"):
+            status, cache_hit = await get_current_weather()
+
+    assert cache_hit is False
+    assert status.station_id == "99999"
+
+
 # =============================================================================
 # Test: API Timeout Handling
 # =============================================================================
@@ -264,8 +342,6 @@ async def test_cache_valid_within_ttl():
 @pytest.mark.asyncio
 async def test_api_timeout_with_stale_cache():
     """Test that API timeout returns stale cache if available"""
-    from app.services import weather
-    from app.services.weather import get_current_weather, fetch_weather_from_api
     from app.models.weather import WeatherStatus
 
     # Pre-populate cache with stale data
@@ -278,8 +354,7 @@ async def test_api_timeout_with_stale_cache():
         cached_at=datetime.now(timezone.utc) - timedelta(hours=1),
         message="Stale data"
     )
-    weather._weather_cache = stale_status
-    weather._cache_time = datetime.now(timezone.utc) - timedelta(hours=1)  # Expired
+    age_weather_cache(3600, stale_status)  # Expired
 
     # Mock API to raise timeout
     async def mock_fetch_timeout():
@@ -297,7 +372,6 @@ async def test_api_timeout_with_stale_cache():
 @pytest.mark.asyncio
 async def test_api_timeout_without_cache_raises():
     """Test that API timeout without cache raises exception"""
-    from app.services.weather import get_current_weather
 
     async def mock_fetch_timeout():
         raise asyncio.TimeoutError("API timeout")
@@ -314,34 +388,28 @@ async def test_api_timeout_without_cache_raises():
 @pytest.mark.asyncio
 async def test_api_error_4xx():
     """Test handling of 4xx HTTP errors"""
-    from app.services.weather import fetch_weather_from_api
 
     mock_response = MockResponse({"error": "Bad request"}, status=400)
     mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        with pytest.raises(Exception, match="status 400"):
-            await fetch_weather_from_api()
+    with pytest.raises(Exception, match="status 400"):
+        await fetch_weather_from_api(session=mock_session)
 
 
 @pytest.mark.asyncio
 async def test_api_error_5xx():
     """Test handling of 5xx HTTP errors"""
-    from app.services.weather import fetch_weather_from_api
 
     mock_response = MockResponse({"error": "Internal server error"}, status=500)
     mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        with pytest.raises(Exception, match="status 500"):
-            await fetch_weather_from_api()
+    with pytest.raises(Exception, match="status 500"):
+        await fetch_weather_from_api(session=mock_session)
 
 
 @pytest.mark.asyncio
 async def test_api_error_returns_stale_cache():
     """Test that API errors return stale cache if available"""
-    from app.services import weather
-    from app.services.weather import get_current_weather
     from app.models.weather import WeatherStatus
 
     # Pre-populate cache
@@ -354,8 +422,7 @@ async def test_api_error_returns_stale_cache():
         cached_at=datetime.now(timezone.utc) - timedelta(hours=1),
         message="Stale cloudy data"
     )
-    weather._weather_cache = stale_status
-    weather._cache_time = datetime.now(timezone.utc) - timedelta(hours=1)  # Expired
+    age_weather_cache(3600, stale_status)  # Expired
 
     # Mock API error
     async def mock_fetch_error():
@@ -371,21 +438,18 @@ async def test_api_error_returns_stale_cache():
 @pytest.mark.asyncio
 async def test_invalid_response_format():
     """Test handling of invalid API response format"""
-    from app.services.weather import fetch_weather_from_api
 
     invalid_response = {"unexpected": "format"}
     mock_response = MockResponse(invalid_response)
     mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        with pytest.raises(Exception, match="Failed to parse"):
-            await fetch_weather_from_api()
+    with pytest.raises(Exception, match="Failed to parse"):
+        await fetch_weather_from_api(session=mock_session)
 
 
 @pytest.mark.asyncio
 async def test_missing_sunshine_data():
     """Test handling of response with missing SO data"""
-    from app.services.weather import fetch_weather_from_api
 
     response_no_data = {
         "type": "FeatureCollection",
@@ -408,9 +472,8 @@ async def test_missing_sunshine_data():
     mock_response = MockResponse(response_no_data)
     mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        with pytest.raises(Exception, match="No sunshine data"):
-            await fetch_weather_from_api()
+    with pytest.raises(Exception, match="No sunshine data"):
+        await fetch_weather_from_api(session=mock_session)
 
 
 # =============================================================================
@@ -418,28 +481,20 @@ async def test_missing_sunshine_data():
 # =============================================================================
 
 @pytest.mark.asyncio
-async def test_is_sunny_helper_returns_true():
+async def test_is_sunny_helper_returns_true(sunny_session):
     """Test is_sunny() helper returns True when sunny"""
-    from app.services.weather import is_sunny
-
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         result = await is_sunny()
 
     assert result is True
 
 
 @pytest.mark.asyncio
-async def test_is_sunny_helper_returns_false():
+async def test_is_sunny_helper_returns_false(cloudy_session):
     """Test is_sunny() helper returns False when cloudy"""
-    from app.services.weather import is_sunny
 
-    mock_response = MockResponse(CLOUDY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
-
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=cloudy_session):
         result = await is_sunny()
 
     assert result is False
@@ -448,7 +503,6 @@ async def test_is_sunny_helper_returns_false():
 @pytest.mark.asyncio
 async def test_is_sunny_helper_returns_false_on_error():
     """Test is_sunny() helper returns False on API error (conservative default)"""
-    from app.services.weather import is_sunny
 
     async def mock_fetch_error():
         raise Exception("API error")
@@ -460,14 +514,10 @@ async def test_is_sunny_helper_returns_false_on_error():
 
 
 @pytest.mark.asyncio
-async def test_get_sunshine_seconds_helper():
+async def test_get_sunshine_seconds_helper(sunny_session):
     """Test get_sunshine_seconds() helper"""
-    from app.services.weather import get_sunshine_seconds
-
-    mock_response = MockResponse(SUNNY_RESPONSE)
-    mock_session = MockClientSession(mock_response)
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
+    with patch("aiohttp.ClientSession", return_value=sunny_session):
         result = await get_sunshine_seconds()
 
     assert result == 600
@@ -476,7 +526,6 @@ async def test_get_sunshine_seconds_helper():
 @pytest.mark.asyncio
 async def test_get_sunshine_seconds_returns_zero_on_error():
     """Test get_sunshine_seconds() returns 0 on error"""
-    from app.services.weather import get_sunshine_seconds
 
     async def mock_fetch_error():
         raise Exception("API error")
@@ -487,103 +536,38 @@ async def test_get_sunshine_seconds_returns_zero_on_error():
     assert result == 0
 
 
-# =============================================================================
-# Test: Exposure Service Integration with Weather Gate
-# =============================================================================
-
-@pytest.mark.asyncio
-async def test_exposure_returns_shady_when_cloudy():
-    """Test that exposure service returns 'shady' when weather is cloudy"""
-    from app.services.exposure import get_bench_sun_status
-    from app.services import weather
-
-    # Mock weather to return cloudy
-    async def mock_is_sunny():
-        return False
-
-    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny):
-        status, sun_until, remaining = await get_bench_sun_status(bench_id=1)
-
-    assert status == "shady"
-    assert sun_until is None
-    assert remaining is None
-
-
-@pytest.mark.asyncio
-async def test_exposure_skips_weather_check_when_requested():
-    """Test that skip_weather_check=True bypasses weather gate"""
-    from app.services.exposure import get_bench_sun_status
-
-    # Mock the database query to return exposed=True
-    async def mock_get_exposure(bench_id, time):
-        return True
-
-    async def mock_get_next_change(bench_id, time, exposed):
-        return None
-
-    with patch("app.services.exposure.get_current_exposure", side_effect=mock_get_exposure):
-        with patch("app.services.exposure.get_next_sun_change", side_effect=mock_get_next_change):
-            status, sun_until, remaining = await get_bench_sun_status(
-                bench_id=1, skip_weather_check=True
-            )
-
-    # Should return sunny based on DB, not blocked by weather
-    assert status == "sunny"
-
-
 @pytest.mark.asyncio
-async def test_exposure_queries_db_when_sunny():
-    """Test that exposure service queries DB when weather is sunny"""
-    from app.services.exposure import get_bench_sun_status
-
-    # Mock weather to return sunny
-    async def mock_is_sunny():
-        return True
+async def test_api_calls_reuse_one_http_session(sunny_session):
+    """Test that repeated weather API calls share one HTTP session"""
 
-    # Mock DB to return bench is shaded
-    async def mock_get_exposure(bench_id, time):
-        return False
+    with patch("aiohttp.ClientSession", return_value=sunny_session) as session_class:
+        await fetch_weather_from_api()
+        await fetch_weather_from_api()
 
-    async def mock_get_next_change(bench_id, time, exposed):
-        return datetime.utcnow() + timedelta(hours=1)
-
-    with patch("app.services.exposure.check_weather_sunny", side_effect=mock_is_sunny):
-        with patch("app.services.exposure.get_current_exposure", side_effect=mock_get_exposure):
-            with patch("app.services.exposure.get_next_sun_change", side_effect=mock_get_next_change):
-                status, sun_until, remaining = await get_bench_sun_status(bench_id=1)
-
-    # Should return shady based on DB query (bench not exposed despite sunny weather)
-    assert status == "shady"
-    assert sun_until is not None
+    session_class.assert_called_once()
 
 
 # =============================================================================
 # Test: Status Message Generation
 # =============================================================================
 
-@pytest.mark.asyncio
-async def test_status_message_full_sun():
+def test_status_message_full_sun():
     """Test status message for full sunshine (>= 10 min)"""
-    from app.services.weather import _create_status_message
 
     message = _create_status_message(is_sunny=True, sunshine_seconds=600)
     assert "Sunny conditions" in message
 
 
-@pytest.mark.asyncio
-async def test_status_message_partial_sun():
+def test_status_message_partial_sun():
     """Test status message for partial sunshine (< 10 min)"""
-    from app.services.weather import _create_status_message
 
     message = _create_status_message(is_sunny=True, sunshine_seconds=180)
     assert "Partial sunshine" in message
     assert "3 min" in message
 
 
-@pytest.mark.asyncio
-async def test_status_message_cloudy():
+def test_status_message_cloudy():
     """Test status message for cloudy conditions"""
-    from app.services.weather import _create_status_message
 
     message = _create_status_message(is_sunny=False, sunshine_seconds=0)
     assert "Overcast" in message or "cloudy" in message
@@ -593,10 +577,8 @@ async def test_status_message_cloudy():
 # Test: Station Name Mapping
 # =============================================================================
 
-@pytest.mark.asyncio
-async def test_station_name_mapping():
+def test_station_name_mapping():
     """Test that station names are correctly mapped"""
-    from app.services.weather import STATION_NAMES
 
     assert STATION_NAMES["11290"] == "Graz Universitaet"
     assert STATION_NAMES["11240"] == "Graz-Thalerhof-Flughafen"
@@ -605,7 +587,6 @@ async def test_station_name_mapping():
 @pytest.mark.asyncio
 async def test_unknown_station_gets_default_name():
     """Test that unknown station ID gets a default name"""
-    from app.services.weather import fetch_weather_from_api
     from app.config import settings
 
     # Create response with unknown station
@@ -617,8 +598,7 @@ async def test_unknown_station_gets_default_name():
     # Temporarily change station ID to unknown
     original_station = settings.geosphere_station_id
 
-    with patch("aiohttp.ClientSession", return_value=mock_session):
-        with patch.object(settings, "geosphere_station_id", "99999"):
-            status = await fetch_weather_from_api()
+    with patch.object(settings, "geosphere_station_id", "99999"):
+        status = await fetch_weather_from_api(session=mock_session)
 
     assert "99999" in status.station_name or "Station" in status.station_name
@@ -0,0 +1,47 @@
+-- Covering indexes for the API's exposure lookups
+-- Run after 002_create_indexes.sql
+
+-- ============================================================================
+-- Covering Index on Exposure (current status)
+-- ============================================================================
+-- The API looks up exposure by (bench_id, ts_id) and only reads `exposed`.
+-- INCLUDE (exposed) lets those lookups run as index-only scans.
+-- timescaledb.transaction_per_chunk builds it chunk by chunk without
+-- holding a lock on the whole hypertable (CONCURRENTLY is not supported
+-- on hypertables).
+CREATE INDEX IF NOT EXISTS exposure_bench_ts_inc_idx ON exposure (bench_id, ts_id)
+    INCLUDE (exposed)
+    WITH (timescaledb.transaction_per_chunk);
+
+COMMENT ON INDEX exposure_bench_ts_inc_idx IS 'Covering index for exposure lookups by bench and timestamp';
+
+-- Same key columns as the covering index (a btree scans either direction)
+DROP INDEX IF EXISTS exposure_bench_ts_idx;
+
+-- ============================================================================
+-- Next-Change Index on Exposure
+-- ============================================================================
+-- "When does this bench next flip?" only needs rows in the opposite state:
+-- (bench_id, exposed) narrows to those, ts_id keeps them in time order.
+CREATE INDEX IF NOT EXISTS exposure_bench_exposed_ts_idx ON exposure (bench_id, exposed, ts_id)
+    WITH (timescaledb.transaction_per_chunk);
+
+COMMENT ON INDEX exposure_bench_exposed_ts_idx IS 'Index for finding the next exposure change of a bench';
+
+-- ============================================================================
+-- Timestamps
+-- ============================================================================
+-- timestamps.ts is UNIQUE, so its constraint index already serves ts -> id
+-- lookups with a single probe; the extra btree only slows down inserts.
+DROP INDEX IF EXISTS timestamps_ts_idx;
+
+ANALYZE exposure;
+ANALYZE timestamps;
+
+-- ============================================================================
+-- Success Message
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'Exposure covering indexes created successfully';
+END $$;
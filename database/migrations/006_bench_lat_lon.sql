@@ -0,0 +1,24 @@
+-- Stored latitude/longitude columns on benches
+-- Run after 005_exposure_covering_indexes.sql
+
+-- ============================================================================
+-- Generated Coordinates
+-- ============================================================================
+-- Benches are static, so extract the coordinates from geom once on write
+-- instead of calling ST_Y/ST_X for every row the API reads.
+ALTER TABLE benches
+    ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION
+        GENERATED ALWAYS AS (ST_Y(geom::geometry)) STORED,
+    ADD COLUMN IF NOT EXISTS lon DOUBLE PRECISION
+        GENERATED ALWAYS AS (ST_X(geom::geometry)) STORED;
+
+COMMENT ON COLUMN benches.lat IS 'Latitude derived from geom (generated)';
+COMMENT ON COLUMN benches.lon IS 'Longitude derived from geom (generated)';
+
+-- ============================================================================
+-- Success Message
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'Bench lat/lon columns added';
+END $$;
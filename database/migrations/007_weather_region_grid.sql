@@ -0,0 +1,94 @@
+-- Coarser weather region grid shared by the API and the SQL helpers
+-- Run after 006_bench_lat_lon.sql
+
+-- ============================================================================
+-- Region Identifier Function
+-- ============================================================================
+-- Benches are grouped into 0.2° cells (5 per degree; ~22 km N-S, ~15 km E-W
+-- at Graz) so most of the city shares one cached forecast. Must match
+-- REGION_GRID in backend/app/services/weather_openmeteo.py.
+CREATE OR REPLACE FUNCTION weather_region_id(
+    p_lat DOUBLE PRECISION,
+    p_lon DOUBLE PRECISION
+) RETURNS TEXT AS $$
+    SELECT 'graz_' || floor(p_lat::numeric * 5)::int || '_' || floor(p_lon::numeric * 5)::int;
+$$ LANGUAGE sql IMMUTABLE;
+
+COMMENT ON FUNCTION weather_region_id IS 'Weather cache region identifier for a coordinate (0.2 degree grid)';
+
+-- ============================================================================
+-- Get Weather-Adjusted Exposure Status Function
+-- ============================================================================
+-- Same as 004_weather_cache.sql, with the region taken from weather_region_id
+CREATE OR REPLACE FUNCTION get_weather_adjusted_exposure(
+    p_bench_id INTEGER,
+    p_forecast_time TIMESTAMPTZ
+) RETURNS BOOLEAN AS $$
+DECLARE
+    v_lat DOUBLE PRECISION;
+    v_lon DOUBLE PRECISION;
+    v_region_id VARCHAR(50);
+    v_clear_sky_exposed BOOLEAN;
+    v_cloud_cover INTEGER;
+    v_result BOOLEAN;
+BEGIN
+    -- Get bench location
+    SELECT lat, lon
+    INTO v_lat, v_lon
+    FROM benches WHERE id = p_bench_id;
+
+    IF v_lat IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    v_region_id := weather_region_id(v_lat, v_lon);
+
+    -- Get clear-sky exposure from precomputed data
+    SELECT e.exposed INTO v_clear_sky_exposed
+    FROM exposure e
+    JOIN timestamps t ON t.id = e.ts_id
+    WHERE e.bench_id = p_bench_id
+      AND t.ts = date_trunc('hour', p_forecast_time)::timestamptz
+    LIMIT 1;
+
+    -- If not in daylight, immediately return FALSE
+    IF v_clear_sky_exposed = FALSE THEN
+        RETURN FALSE;
+    END IF;
+
+    -- Get cloud cover for this time
+    SELECT cloud_cover_percent INTO v_cloud_cover
+    FROM weather_cache
+    WHERE region_id = v_region_id
+      AND forecast_time = date_trunc('hour', p_forecast_time)::timestamptz
+    LIMIT 1;
+
+    -- If no weather data, assume sunny (optimistic default)
+    IF v_cloud_cover IS NULL THEN
+        RETURN TRUE;
+    END IF;
+
+    -- Apply weather threshold (cloud_cover < 20% = sunny)
+    v_result := v_cloud_cover < 20;
+
+    RAISE DEBUG 'Weather-adjusted exposure for bench % at %: clear_sky=%, cloud_cover=%, result=%',
+                p_bench_id, p_forecast_time, v_clear_sky_exposed, v_cloud_cover, v_result;
+
+    RETURN v_result;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- get_next_sunny_period (004) only reaches weather_cache through
+-- get_weather_adjusted_exposure, so it picks up the new grid unchanged.
+
+-- Forecasts cached under the old 0.1° region ids are no longer read; the
+-- next scheduled update refills the cache under the new ids.
+DELETE FROM weather_cache WHERE region_id <> weather_region_id(latitude, longitude);
+
+-- ============================================================================
+-- Success Message
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'Weather region grid set to 0.2 degrees';
+END $$;
@@ -0,0 +1,34 @@
+-- Covering index for the API's weather_cache lookups
+-- Run after 007_weather_region_grid.sql
+
+-- ============================================================================
+-- Covering Index on weather_cache (forecast reads)
+-- ============================================================================
+-- The API reads forecasts by (region_id, forecast_time), either a single
+-- hour or a range, and only needs cloud cover and fetch time back.
+-- INCLUDE lets those reads run as index-only scans.
+CREATE INDEX IF NOT EXISTS weather_cache_region_time_inc_idx ON weather_cache (region_id, forecast_time)
+    INCLUDE (cloud_cover_percent, fetched_at);
+
+COMMENT ON INDEX weather_cache_region_time_inc_idx IS 'Covering index for forecast lookups by region and time';
+
+-- Same key columns as the covering index and the UNIQUE constraint
+DROP INDEX IF EXISTS idx_weather_cache_time;
+
+-- ============================================================================
+-- Next Sunny Hour
+-- ============================================================================
+-- idx_weather_cache_sunny (004) is partial on is_sunny. The API filters on
+-- is_sunny rather than on a cloud_cover_percent parameter, so even generic
+-- plans of the prepared statement can use the index. The first matching
+-- entry is then the answer.
+
+ANALYZE weather_cache;
+
+-- ============================================================================
+-- Success Message
+-- ============================================================================
+DO $$
+BEGIN
+    RAISE NOTICE 'weather_cache covering index created successfully';
+END $$;